@@ -1,57 +1,153 @@
 #!/usr/bin/env python3
 """Box - CLI container isolation tool"""
 
-import argparse
+import collections
+import functools
+import os
 import subprocess
 import sys
+import shlex
 import shutil
 import json
-import re
-import socket
+import hashlib
+import itertools
 import time
-import atexit
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict, Any
-from .ssh_mount import SSHFSManager
+from typing import TYPE_CHECKING, List, Optional, Tuple, Dict, Any, Callable
+
+if TYPE_CHECKING:
+    import argparse
+    from .ssh_mount import SSHFSManager
+
+
+# Node.js related commands
+_NODE_COMMANDS = frozenset({
+    'npm', 'npx', 'yarn', 'pnpm', 'node', 'nodejs',
+    'webpack', 'vite', 'next', 'nuxt', 'gatsby',
+    'react-scripts', 'vue-cli-service', 'ng', 'angular',
+    'tsc', 'ts-node', 'eslint', 'prettier', 'jest'
+})
+
+# Python related commands
+_PYTHON_COMMANDS = frozenset({
+    'python', 'python3', 'pip', 'pip3', 'pipenv', 'poetry',
+    'pytest', 'black', 'flake8', 'mypy', 'pylint',
+    'django-admin', 'flask', 'gunicorn', 'uvicorn',
+    'jupyter', 'ipython', 'conda', 'mamba'
+})
+
+# Container type for each known command
+_CMD_TO_TYPE = {**dict.fromkeys(_NODE_COMMANDS, 'node'), **dict.fromkeys(_PYTHON_COMMANDS, 'python')}
+
+# Files whose presence in the working directory identifies the project type
+_NODE_MARKERS = frozenset({'package.json', 'yarn.lock', 'pnpm-lock.yaml'})
+_PY_MARKERS = frozenset({'requirements.txt', 'pyproject.toml', 'setup.py', 'Pipfile', 'poetry.lock'})
+
+# Seconds for which a successful daemon check is reused by later runs
+_DAEMON_CHECK_TTL = 5.0
+
+# Lines of build stderr kept for reporting a failed build
+_BUILD_STDERR_LINES = 50
+
+# Dockerfile for each (alpine base, include tmux) combination
+_DOCKERFILE_TEMPLATES = {
+    (True, False): 'FROM {base_image}\nRUN apk add --no-cache bash\nWORKDIR /root\n',
+    (True, True): 'FROM {base_image}\nRUN apk add --no-cache bash tmux\nWORKDIR /root\n',
+    (False, False): 'FROM {base_image}\n# bash already available\nWORKDIR /root\n',
+    (False, True): (
+        'FROM {base_image}\n'
+        'RUN apt-get update && apt-get install -y tmux && rm -rf /var/lib/apt/lists/*\n'
+        'WORKDIR /root\n'
+    ),
+}
+
+# Maximum number of images passed to a single 'rmi' call
+_RMI_BATCH_SIZE = 64
+
+# Characters that are not valid in image names, mapped to '-'
+_SAFE_TABLE = str.maketrans({':': '-', '/': '-'})
+
+
+def _dump_json(data: Any) -> bytes:
+    """Serialize data as indented JSON, using orjson when it is installed"""
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(data, indent=2).encode('utf-8')
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+
+def _load_json(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is installed"""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads(data)
+    return orjson.loads(data)
 
 
 class ConfigManager:
     """Manage box CLI configuration for named images"""
     
-    def __init__(self):
-        self.config_dir = Path.home() / '.box-cli'
+    def __init__(self, home_dir: Optional[Path] = None):
+        self.config_dir = Path(home_dir or Path.home()) / '.box-cli'
         self.config_file = self.config_dir / 'config.json'
-        self.config = self._load_config()
+        self._config: Optional[Dict[str, Any]] = None
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Configuration, loaded from file on first access"""
+        if self._config is None:
+            self._config = self._load_config()
+        return self._config
+    
+    @property
+    def _images(self) -> Dict[str, Any]:
+        """Named image configurations"""
+        return self.config.setdefault('images', {})
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file or create default"""
-        if not self.config_dir.exists():
-            self.config_dir.mkdir(parents=True, exist_ok=True)
-        
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return {'images': {}}
-        return {'images': {}}
+        try:
+            return _load_json(self.config_file.read_bytes())
+        except (json.JSONDecodeError, IOError):
+            return {'images': {}}
     
     def _save_config(self) -> None:
-        """Save configuration to file"""
+        """Save configuration to file, replacing it atomically"""
+        import tempfile
+        # Serialize up front so the file is written in one call rather than per token
+        data = _dump_json(self.config)
+        tmp_path = None
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            # Write through a symlinked config.json (e.g. into a dotfiles repo) instead of replacing it
+            target = os.path.realpath(str(self.config_file))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            # mkstemp creates the file as 0600; keep the existing file's mode, or honor the umask
+            try:
+                mode = os.stat(target).st_mode & 0o7777
+            except FileNotFoundError:
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = 0o666 & ~umask
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, target)
         except IOError as e:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
             print(f"Warning: Could not save config: {e}", file=sys.stderr)
     
-    def save_image_config(self, name: str, args: argparse.Namespace, force: bool = False) -> bool:
+    def save_image_config(self, name: str, args: 'argparse.Namespace', force: bool = False) -> bool:
         """Save configuration for a named image
         
         Returns True if config was saved, False if user cancelled
         """
         # Check if image already exists and prompt for confirmation
-        if not force and name in self.config.get('images', {}):
-            existing = self.config['images'][name]
+        if not force and name in self._images:
+            existing = self._images[name]
             print(f"\nWarning: Named image '{name}' already exists with configuration:")
             print(f"  Command: {' '.join(existing.get('command', [])) or '(interactive shell)'}")
             if existing.get('node'):
@@ -84,22 +180,22 @@ class ConfigManager:
             'http_proxy': getattr(args, 'http_proxy', None)
         }
         
-        self.config['images'][name] = config_entry
+        self._images[name] = config_entry
         self._save_config()
         print(f"✓ Saved configuration for image '{name}'")
         return True
     
     def get_image_config(self, name: str) -> Optional[Dict[str, Any]]:
         """Get configuration for a named image"""
-        return self.config.get('images', {}).get(name)
+        return self._images.get(name)
     
     def list_named_images(self) -> List[str]:
         """List all configured named images"""
-        return list(self.config.get('images', {}).keys())
+        return list(self._images.keys())
     
     def display_named_images(self) -> None:
         """Display all named images with their configurations"""
-        images = self.config.get('images', {})
+        images = self._images
         
         if not images:
             print("No named images configured.")
@@ -163,31 +259,81 @@ class ContainerRuntime:
     """Detect and manage container runtime (Docker or Podman)"""
 
     def __init__(self):
-        self.runtime = self._detect_runtime()
+        self.cache_file = Path.home() / '.box-cli' / 'runtime.json'
+        self.runtime, verified_at = self._load_cached_runtime()
+        cached_runtime = self.runtime
+        if not self.runtime:
+            self.runtime = self._detect_runtime()
         if not self.runtime:
             print("Error: Neither Docker nor Podman is installed.", file=sys.stderr)
             print("Please install Docker or Podman to use this tool.", file=sys.stderr)
             sys.exit(1)
 
+        # A daemon that answered moments ago is assumed to still be running
+        if 0 <= time.time() - verified_at < _DAEMON_CHECK_TTL:
+            return
+
         # Check if the runtime daemon is actually running
-        if not self._check_daemon_running():
+        running = self._check_daemon_running()
+        new_verified_at = time.time() if running else 0.0
+        # Leave the cache file alone when neither the path nor the check result changed
+        if self.runtime != cached_runtime or new_verified_at != verified_at:
+            self._save_cached_runtime(new_verified_at)
+        if not running:
             self.print_daemon_not_running_error()
             sys.exit(1)
 
+    @property
+    def name(self) -> str:
+        """Runtime name ('docker' or 'podman') without the binary's directory"""
+        return os.path.splitext(os.path.basename(self.runtime))[0]
+
     def _detect_runtime(self) -> Optional[str]:
-        """Detect available container runtime"""
+        """Detect available container runtime and return its full path"""
         for runtime in ['docker', 'podman']:
-            if shutil.which(runtime):
-                return runtime
+            path = shutil.which(runtime)
+            if path:
+                return path
         return None
 
+    def _load_cached_runtime(self) -> Tuple[Optional[str], float]:
+        """Return the runtime path cached by a previous run if it is still executable,
+        along with when its daemon was last seen running
+        """
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+            path = cache.get('path')
+            verified_at = float(cache.get('verified_at', 0.0))
+        except (json.JSONDecodeError, IOError, AttributeError, TypeError, ValueError):
+            return None, 0.0
+        if path and os.access(path, os.X_OK):
+            return path, verified_at
+        return None, 0.0
+
+    def _save_cached_runtime(self, verified_at: float = 0.0) -> None:
+        """Cache the runtime path and daemon check time, replacing the cache file atomically"""
+        import tempfile
+        tmp_path = None
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.cache_file.parent), suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'path': self.runtime, 'verified_at': verified_at}, f)
+            os.replace(tmp_path, str(self.cache_file))
+        except OSError:
+            # The cache is only an optimization, but do not leave the temporary file behind
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
     def _check_daemon_running(self) -> bool:
         """Check if the container runtime daemon is running"""
         try:
             # Try a simple version command to test connectivity
             result = subprocess.run(
                 [self.runtime, 'version'],
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=5
             )
             return result.returncode == 0
@@ -196,7 +342,7 @@ class ContainerRuntime:
 
     def print_daemon_not_running_error(self) -> None:
         """Print standardized error message when daemon is not running"""
-        if self.runtime == 'docker':
+        if self.name == 'docker':
             print(f"Error: Docker daemon is not running.", file=sys.stderr)
             print("Please start Docker Desktop or the Docker daemon to continue.", file=sys.stderr)
         else:  # podman
@@ -208,6 +354,24 @@ class ContainerRuntime:
         cmd = [self.runtime] + args
         return subprocess.run(cmd)
 
+    def exec_command(self, args: List[str]) -> None:
+        """Replace the current process with a container runtime command"""
+        cmd = [self.runtime] + args
+        # Buffered output would be lost once the process image is replaced
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            os.execvp(cmd[0], cmd)
+        except FileNotFoundError:
+            # The runtime was removed after it was detected or cached
+            print(f"Error: {self.name} is no longer installed at {self.runtime}.", file=sys.stderr)
+            print("Please install Docker or Podman to use this tool.", file=sys.stderr)
+            sys.exit(1)
+        except OSError as e:
+            # e.g. the cached runtime path is no longer executable
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
 
 class Args:
     """Standardized arguments container for image operations"""
@@ -241,6 +405,8 @@ class ImageBuilder:
     def __init__(self, runtime: 'ContainerRuntime', config_manager: Optional['ConfigManager'] = None):
         self.runtime = runtime
         self.config_manager = config_manager
+        # Local image references mapped to their IDs (None when not known), from one listing
+        self._image_ids: Optional[Dict[str, Optional[str]]] = None
     
     def detect_container_type_from_command(self, command: List[str]) -> str:
         """Auto-detect container type based on the command"""
@@ -249,46 +415,24 @@ class ImageBuilder:
         
         first_cmd = command[0].lower()
         
-        # Node.js related commands
-        node_commands = {
-            'npm', 'npx', 'yarn', 'pnpm', 'node', 'nodejs',
-            'webpack', 'vite', 'next', 'nuxt', 'gatsby',
-            'react-scripts', 'vue-cli-service', 'ng', 'angular',
-            'tsc', 'ts-node', 'eslint', 'prettier', 'jest'
-        }
-        
-        # Python related commands
-        python_commands = {
-            'python', 'python3', 'pip', 'pip3', 'pipenv', 'poetry',
-            'pytest', 'black', 'flake8', 'mypy', 'pylint',
-            'django-admin', 'flask', 'gunicorn', 'uvicorn',
-            'jupyter', 'ipython', 'conda', 'mamba'
-        }
-        
         # Check direct command matches
-        if first_cmd in node_commands:
-            return 'node'
-        elif first_cmd in python_commands:
-            return 'python'
+        container_type = _CMD_TO_TYPE.get(first_cmd)
+        if container_type:
+            return container_type
         
         # Check for package.json or common Node.js files in current directory
-        if first_cmd in ['bash', 'sh', 'zsh']:
+        if first_cmd in ('bash', 'sh', 'zsh'):
             try:
-                from pathlib import Path
-                current_dir = Path.cwd()
+                # One directory read instead of a stat() per indicator file
+                with os.scandir('.') as entries:
+                    names = {entry.name for entry in entries}
                 
                 # Check for Node.js project indicators
-                if (current_dir / 'package.json').exists() or \
-                   (current_dir / 'yarn.lock').exists() or \
-                   (current_dir / 'pnpm-lock.yaml').exists():
+                if names & _NODE_MARKERS:
                     return 'node'
                 
                 # Check for Python project indicators
-                if (current_dir / 'requirements.txt').exists() or \
-                   (current_dir / 'pyproject.toml').exists() or \
-                   (current_dir / 'setup.py').exists() or \
-                   (current_dir / 'Pipfile').exists() or \
-                   (current_dir / 'poetry.lock').exists():
+                if names & _PY_MARKERS:
                     return 'python'
             except Exception:
                 pass
@@ -296,8 +440,8 @@ class ImageBuilder:
         # Default to alpine for unrecognized commands
         return 'alpine'
     
-    def get_base_image(self, args) -> str:
-        """Get the base image name"""
+    def get_base_image(self, args, detected_type: Optional[str] = None) -> str:
+        """Get the base image name, reusing detected_type if already known"""
         # Explicit flags take precedence
         if args.node:
             version = args.image_version if args.image_version else 'lts'
@@ -307,7 +451,8 @@ class ImageBuilder:
             return f'python:{version}'
         
         # Auto-detect based on command
-        detected_type = self.detect_container_type_from_command(args.command)
+        if detected_type is None:
+            detected_type = self.detect_container_type_from_command(args.command)
         version = args.image_version if args.image_version else None
         
         if detected_type == 'node':
@@ -321,64 +466,99 @@ class ImageBuilder:
     
     def get_box_image_name(self, base_image: str, include_tmux: bool = False, custom_name: Optional[str] = None) -> str:
         """Generate box image name from base image or use custom name"""
+        suffix = '-tmux' if include_tmux else ''
         if custom_name:
             # Use custom name for the image
-            suffix = ''
-            if include_tmux:
-                suffix += '-tmux'
             return f'box-named-{custom_name}{suffix}'
-        else:
-            # Replace : and / with - for valid image names
-            safe_name = base_image.replace(':', '-').replace('/', '-')
-            suffix = ''
-            if include_tmux:
-                suffix += '-tmux'
-            return f'box-{safe_name}{suffix}'
+        # Replace : and / with - for valid image names
+        return f'box-{base_image.translate(_SAFE_TABLE)}{suffix}'
     
     def image_exists(self, image_name: str) -> bool:
         """Check if image already exists locally"""
-        return self._run_container_command(['image', 'inspect', image_name], capture_output=True)
+        if self._image_ids is None:
+            self._image_ids = self._list_local_images()
+            if self._image_ids is None:
+                # Listing failed, fall back to asking about this image alone
+                return self._run_container_command(['image', 'inspect', image_name], quiet=True)
+        return self._normalize_image_ref(image_name) in self._image_ids
+    
+    def get_image_id(self, image_name: str) -> Optional[str]:
+        """Look up the ID of a local image, or None if it cannot be found"""
+        if self._image_ids is not None:
+            image_id = self._image_ids.get(self._normalize_image_ref(image_name))
+            if image_id:
+                return image_id
+        
+        # Not in the listing, e.g. built by this run, so ask about this image alone
+        result = subprocess.run(
+            [self.runtime.runtime, 'image', 'inspect', '--format', '{{.Id}}', image_name],
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            return None
+        return result.stdout.strip() or None
     
-    def _run_container_command(self, args: List[str], capture_output: bool = False) -> bool:
+    def _remember_image(self, image_name: str) -> None:
+        """Record a newly created image in the cached listing"""
+        if self._image_ids is not None:
+            self._image_ids[self._normalize_image_ref(image_name)] = None
+    
+    def _list_local_images(self) -> Optional[Dict[str, Optional[str]]]:
+        """List all local image references and their IDs with a single runtime call"""
+        try:
+            result = subprocess.run(
+                [self.runtime.runtime, 'images', '--format', '{{.Repository}}:{{.Tag}} {{.ID}}'],
+                capture_output=True,
+                text=True
+            )
+        except Exception:
+            return None
+        
+        if result.returncode != 0:
+            return None
+        
+        images = {}
+        for line in result.stdout.splitlines():
+            ref, _, image_id = line.strip().partition(' ')
+            if ref:
+                images[ref] = images[self._short_image_ref(ref)] = image_id.strip() or None
+        return images
+    
+    @staticmethod
+    def _short_image_ref(ref: str) -> str:
+        """Strip the registry prefix Podman adds to references (localhost/box-..., docker.io/library/node:...)"""
+        for prefix in ('localhost/', 'docker.io/library/', 'docker.io/'):
+            if ref.startswith(prefix):
+                return ref[len(prefix):]
+        return ref
+    
+    @staticmethod
+    def _normalize_image_ref(image_name: str) -> str:
+        """Add the implicit ':latest' tag to an image reference"""
+        if ':' not in image_name.rsplit('/', 1)[-1]:
+            return f'{image_name}:latest'
+        return image_name
+    
+    def _run_container_command(self, args: List[str], quiet: bool = False) -> bool:
         """Run container command and return success status"""
         try:
             cmd = [self.runtime.runtime] + args
-            result = subprocess.run(cmd, capture_output=capture_output, text=True)
+            # Output that is never read goes straight to /dev/null rather than through a pipe
+            output = subprocess.DEVNULL if quiet else None
+            result = subprocess.run(cmd, stdout=output, stderr=output)
             return result.returncode == 0
         except Exception:
             return False
     
-    def _pull_base_image(self, base_image: str) -> bool:
-        """Pull base image and return success status"""
-        print(f"Pulling base image: {base_image}")
-        success = self._run_container_command(['pull', base_image], capture_output=True)
-        if not success:
-            print(f"Warning: Could not pull {base_image}, trying to build anyway...")
-        return success
-    
     def build_dockerfile_content(self, base_image: str, include_tmux: bool = False) -> str:
         """Generate Dockerfile content for the given base image"""
-        install_cmds = []
-        
-        if 'alpine' in base_image:
-            packages = ['bash']
-            if include_tmux:
-                packages.append('tmux')
-            install_cmds.append(f'RUN apk add --no-cache {" ".join(packages)}')
-        else:
-            packages = []
-            if include_tmux:
-                packages.append('tmux')
-            
-            if packages:
-                install_cmds.append(f'RUN apt-get update && apt-get install -y {" ".join(packages)} && rm -rf /var/lib/apt/lists/*')
-            else:
-                install_cmds.append('# bash already available')
-        
-        return f"""FROM {base_image}
-{chr(10).join(install_cmds)}
-WORKDIR /root
-"""
+        return _DOCKERFILE_TEMPLATES['alpine' in base_image, include_tmux].format(base_image=base_image)
+    
+    def get_dockerfile_tag(self, base_image: str, include_tmux: bool = False) -> str:
+        """Generate an image tag from the hash of the Dockerfile content"""
+        dockerfile_content = self.build_dockerfile_content(base_image, include_tmux)
+        return hashlib.sha256(dockerfile_content.encode('utf-8')).hexdigest()[:12]
     
     def build_image(self, base_image: str, box_image_name: str, include_tmux: bool = False) -> bool:
         """Build the box image with optional tmux"""
@@ -393,24 +573,33 @@ WORKDIR /root
         dockerfile_content = self.build_dockerfile_content(base_image, include_tmux)
         
         try:
-            # Build image using stdin for Dockerfile
-            result = subprocess.run(
-                [self.runtime.runtime, 'build', '-t', box_image_name, '-'],
-                input=dockerfile_content,
-                text=True,
-                capture_output=True
+            # Build from a stable on-disk context so the layer cache is reused across runs
+            build_dir = Path.home() / '.box-cli' / 'build' / box_image_name.partition(':')[0]
+            build_dir.mkdir(parents=True, exist_ok=True)
+            (build_dir / 'Dockerfile').write_text(dockerfile_content)
+            
+            process = subprocess.Popen(
+                [self.runtime.runtime, 'build', '-t', box_image_name, str(build_dir)],
+                stdout=subprocess.DEVNULL,  # Build log is never shown; only stderr is reported on failure
+                stderr=subprocess.PIPE
             )
+            # BuildKit writes its whole progress log to stderr, so only keep the tail
+            stderr_tail = collections.deque(process.stderr, maxlen=_BUILD_STDERR_LINES)
+            process.stderr.close()
             
-            if result.returncode == 0:
+            if process.wait() == 0:
                 print(f"✓ Successfully built {box_image_name}")
+                self._remember_image(box_image_name)
                 return True
             else:
+                # stderr is left as bytes and only decoded when it is reported
+                stderr = b''.join(stderr_tail).decode('utf-8', errors='replace')
                 # Check for common connection errors
-                if "connection refused" in result.stderr.lower() or "cannot connect" in result.stderr.lower():
+                if "connection refused" in stderr.lower() or "cannot connect" in stderr.lower():
                     print("✗ ", end="", file=sys.stderr)
                     self.runtime.print_daemon_not_running_error()
                 else:
-                    print(f"✗ Failed to build image: {result.stderr}")
+                    print(f"✗ Failed to build image: {stderr}")
                 return False
         except Exception as e:
             print(f"✗ Error building image: {e}")
@@ -418,25 +607,30 @@ WORKDIR /root
     
     def get_or_build_image(self, args) -> str:
         """Get existing box image or build it if needed"""
-        base_image = self.get_base_image(args)
+        # Detect once and share the result with get_base_image
+        detected_type = None
+        if not args.node and not args.py:
+            detected_type = self.detect_container_type_from_command(args.command)
+        
+        base_image = self.get_base_image(args, detected_type)
         use_tmux = args.tmux
         custom_name = args.name if hasattr(args, 'name') else None
         box_image_name = self.get_box_image_name(base_image, use_tmux, custom_name)
         
         # Show auto-detection info if no explicit flags were used
-        if not args.node and not args.py and args.command:
-            detected_type = self.detect_container_type_from_command(args.command)
+        if detected_type is not None and args.command:
             if detected_type != 'alpine':
                 print(f"Auto-detected {detected_type.title()} environment for command: {' '.join(args.command)}")
         
+        # Tag generated images with their Dockerfile hash so a changed template gets a fresh build
+        if not custom_name:
+            box_image_name += ':' + self.get_dockerfile_tag(base_image, use_tmux)
+        
         # Check if box image already exists
         if self.image_exists(box_image_name):
             return box_image_name
         
-        # Pull base image first to ensure it exists
-        self._pull_base_image(base_image)
-        
-        # Build the box image
+        # Build the box image; the build pulls the base image if it is missing
         if self.build_image(base_image, box_image_name, use_tmux):
             return box_image_name
         else:
@@ -448,17 +642,16 @@ WORKDIR /root
         """Remove all box-built images"""
         try:
             # List all images with box- prefix
-            result = subprocess.run(
-                [self.runtime.runtime, 'images', '--filter', 'reference=box-*', '--format', '{{.Repository}}:{{.Tag}}'],
-                capture_output=True,
-                text=True
-            )
+            if self._image_ids is None:
+                self._image_ids = self._list_local_images()
             
-            if result.returncode != 0:
+            if self._image_ids is None:
                 print("Failed to list box images")
                 return
             
-            images = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+            # Only box's own images: like the runtime's reference=box-* filter, the
+            # prefix must not match repositories such as box-org/tool
+            images = sorted(ref for ref in self._image_ids if ref.startswith('box-') and '/' not in ref)
             
             if not images:
                 print("No box images found to clean")
@@ -468,20 +661,46 @@ WORKDIR /root
             for image in images:
                 print(f"  - {image}")
             
-            # Remove each image
             removed_count = 0
-            for image in images:
+            # Remove images in batches, keeping each argv well below ARG_MAX
+            for start in range(0, len(images), _RMI_BATCH_SIZE):
+                batch = images[start:start + _RMI_BATCH_SIZE]
                 remove_result = subprocess.run(
-                    [self.runtime.runtime, 'rmi', image],
-                    capture_output=True
+                    [self.runtime.runtime, 'rmi', *batch],
+                    capture_output=True,
+                    text=True
                 )
-                if remove_result.returncode == 0:
-                    print(f"✓ Removed {image}")
-                    removed_count += 1
-                else:
-                    print(f"✗ Failed to remove {image}")
+                
+                # Images the runtime reports as untagged were removed even if others failed
+                untagged = set()
+                if remove_result.returncode != 0:
+                    for line in remove_result.stdout.splitlines():
+                        if line.startswith('Untagged:'):
+                            untagged.add(self._short_image_ref(line.split(':', 1)[1].strip()))
+                
+                for image in batch:
+                    if remove_result.returncode == 0 or image in untagged:
+                        print(f"✓ Removed {image}")
+                        removed_count += 1
+                        continue
+                    
+                    # Retry the rest one at a time so each gets its own result and error
+                    single_result = subprocess.run(
+                        [self.runtime.runtime, 'rmi', image],
+                        capture_output=True,
+                        text=True
+                    )
+                    if single_result.returncode == 0:
+                        print(f"✓ Removed {image}")
+                        removed_count += 1
+                    else:
+                        print(f"✗ Failed to remove {image}")
+                        if single_result.stderr.strip():
+                            print(f"  Error: {single_result.stderr.strip()}")
             
             print(f"Successfully removed {removed_count}/{len(images)} images")
+            # The listing no longer reflects what is stored locally
+            self._image_ids = None
         except Exception as e:
             print(f"Error during cleanup: {e}")
     
@@ -497,30 +716,36 @@ WORKDIR /root
             
             # If we have a command to run, we need to run it and commit the result
             if config.get('command'):
-                return self.build_named_image_with_command(name, config, box_image_name)
+                return self.build_named_image_with_command(name, config, box_image_name, base_image)
             else:
                 # No command, just build the base box image
-                self._pull_base_image(base_image)
-                
-                # Build the image
                 if not self.build_image(base_image, box_image_name, args.tmux):
                     return None
         
         return box_image_name
     
-    def build_named_image_with_command(self, name: str, config: Dict[str, Any], target_image_name: str) -> Optional[str]:
-        """Build a named image by running the saved command and committing the result"""
+    def _remove_build_container(self, name: str) -> None:
+        """Remove the temporary container used to build a named image, ignoring errors"""
+        subprocess.run([self.runtime.runtime, 'rm', f'box-build-{name}'],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    def build_named_image_with_command(self, name: str, config: Dict[str, Any], target_image_name: str,
+                                       base_image: Optional[str] = None) -> Optional[str]:
+        """Build a named image by running the saved command and committing the result
+        
+        base_image may be passed by callers that have already resolved it from the same config
+        """
         # First get/build the base box image
-        base_args = Args(config, None)
-        base_image = self.get_base_image(base_args)
-        box_base_image = self.get_box_image_name(base_image, base_args.tmux)
+        if base_image is None:
+            base_image = self.get_base_image(Args(config, None))
+        include_tmux = config.get('tmux', False)
+        box_base_image = self.get_box_image_name(base_image, include_tmux)
+        box_base_image += ':' + self.get_dockerfile_tag(base_image, include_tmux)
         
         # Build base box image if needed
         if not self.image_exists(box_base_image):
             print(f"Building base box image: {box_base_image}")
-            self._pull_base_image(base_image)
-            
-            if not self.build_image(base_image, box_base_image, base_args.tmux):
+            if not self.build_image(base_image, box_base_image, include_tmux):
                 print(f"Failed to build base box image")
                 return None
         
@@ -540,7 +765,7 @@ WORKDIR /root
             if result.returncode != 0:
                 print(f"Command failed with exit code {result.returncode}")
                 # Clean up the container
-                subprocess.run([self.runtime.runtime, 'rm', f'box-build-{name}'], capture_output=True)
+                self._remove_build_container(name)
                 return None
             
             # Commit the container to create the named image
@@ -549,42 +774,74 @@ WORKDIR /root
                 self.runtime.runtime, 'commit',
                 f'box-build-{name}',
                 target_image_name
-            ], capture_output=True)
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
             
             # Clean up the build container
-            subprocess.run([self.runtime.runtime, 'rm', f'box-build-{name}'], capture_output=True)
+            self._remove_build_container(name)
             
             if commit_result.returncode != 0:
                 print(f"Failed to commit container: {commit_result.stderr.decode()}")
                 return None
             
             print(f"✓ Successfully created named image: {name}")
+            self._remember_image(target_image_name)
             return target_image_name
             
         except Exception as e:
             print(f"Error building named image: {e}")
             # Clean up if something went wrong
-            subprocess.run([self.runtime.runtime, 'rm', f'box-build-{name}'], capture_output=True)
+            self._remove_build_container(name)
             return None
 
 
 
+def _is_ssh_spec(spec: str) -> bool:
+    """Check if a mount spec is an SSH URL, loading SSH support only when it could be one"""
+    # Every SSH URL contains ':' and none start with '/', which rules out most local paths cheaply
+    if ':' not in spec or spec.startswith('/'):
+        return False
+    from .ssh_mount import SSHFSManager
+    return SSHFSManager.is_ssh_url(spec)
+
+
 class VolumeMapper:
     """Handle volume mounting logic including SSH mounts"""
     
     def __init__(self, runtime: 'ContainerRuntime'):
         self.runtime = runtime
-        self.sshfs_mgr = SSHFSManager()
+        self._sshfs_mgr: Optional['SSHFSManager'] = None
+    
+    @property
+    def sshfs_mgr(self) -> 'SSHFSManager':
+        """SSHFS manager, created when the first SSH mount is processed"""
+        if self._sshfs_mgr is None:
+            from .ssh_mount import SSHFSManager
+            self._sshfs_mgr = SSHFSManager()
+        return self._sshfs_mgr
+    
+    def has_ssh_mounts(self) -> bool:
+        """Check if any SSHFS mounts were created"""
+        return self._sshfs_mgr is not None and bool(self._sshfs_mgr.list_mounts())
+    
+    def cleanup_ssh_mounts(self) -> None:
+        """Unmount any SSHFS mounts that were created"""
+        if self._sshfs_mgr is not None:
+            self._sshfs_mgr.cleanup_mounts()
+    
+    @staticmethod
+    def _split_ssh_spec(ssh_spec: str) -> Tuple[str, Optional[str]]:
+        """Split an SSH mount spec into its SSH part and explicit container destination, if any"""
+        first = ssh_spec.find(':')
+        last = ssh_spec.rfind(':')
+        if last > first:
+            # Has explicit destination: user@host:remote:container
+            return ssh_spec[:last], ssh_spec[last + 1:]
+        return ssh_spec, None
     
     def prepare_ssh_mount(self, ssh_spec: str, read_only: bool = False) -> Optional[str]:
         """Create SSHFS mount on host and return local mount path"""
         # Extract the actual SSH part (remove container destination if present)
-        if ssh_spec.count(':') > 1:
-            # Has explicit destination: user@host:remote:container
-            ssh_part = ssh_spec.rsplit(':', 1)[0]
-        else:
-            ssh_part = ssh_spec
-        
+        ssh_part, _ = self._split_ssh_spec(ssh_spec)
         return self.sshfs_mgr.create_ssh_mount(ssh_part, read_only)
     
     
@@ -613,24 +870,21 @@ class VolumeMapper:
     
     def _process_mount_spec(self, spec: str, read_only: bool) -> Tuple[List[str], Optional[str]]:
         """Process a single mount specification and return volume args and destination"""
-        if self.sshfs_mgr.is_ssh_url(spec):
+        if _is_ssh_spec(spec):
             return self._process_ssh_mount(spec, read_only)
         else:
             return self._process_local_mount(spec, read_only)
     
     def _process_ssh_mount(self, spec: str, read_only: bool) -> Tuple[List[str], Optional[str]]:
         """Process SSH mount specification"""
-        local_mount_path = self.prepare_ssh_mount(spec, read_only)
+        ssh_part, container_dest = self._split_ssh_spec(spec)
+        local_mount_path = self.sshfs_mgr.create_ssh_mount(ssh_part, read_only)
         if not local_mount_path:
             return [], None
         
-        # Parse container destination
-        if ':' in spec and spec.count(':') > 1:
-            # Has explicit destination: user@host:remote:container
-            container_dest = spec.rsplit(':', 1)[1]
-        else:
+        if container_dest is None:
             # Use remote path basename as destination
-            user, host, remote_path = self.sshfs_mgr.parse_ssh_url(spec)
+            user, host, remote_path = self.sshfs_mgr.parse_ssh_url(ssh_part)
             container_dest = f'/root/{Path(remote_path).name}'
         
         if not container_dest.startswith('/'):
@@ -664,19 +918,20 @@ class SpecParser:
         if ':' in spec and not spec.startswith('/') and not spec[1:3] == ':\\':
             # Handle src:dest syntax
             parts = spec.split(':', 1)
-            src_path = Path(parts[0]).expanduser().resolve()
+            # abspath is pure string work; resolve() would lstat every path component
+            src_path = os.path.abspath(os.path.expanduser(parts[0]))
             dest_path = parts[1]
             if not dest_path.startswith('/'):
                 # Make destination relative to home directory in container
                 dest_path = f'/root/{dest_path}'
         else:
             # Use basename as destination
-            src_path = Path(spec).expanduser().resolve()
-            dest_name = src_path.name
+            src_path = os.path.abspath(os.path.expanduser(spec))
+            dest_name = os.path.basename(src_path)
             dest_path = f'/root/{dest_name}'
         
         options = 'ro' if read_only else 'rw'
-        return str(src_path), dest_path, options
+        return src_path, dest_path, options
 
 
 class PortMapper:
@@ -698,9 +953,12 @@ class PortMapper:
 class NetworkManager:
     """Handle container network configuration and restrictions"""
 
-    def __init__(self, runtime: 'ContainerRuntime'):
+    def __init__(self, runtime: 'ContainerRuntime', runner: Optional[Callable[..., Any]] = None):
         self.runtime = runtime
+        # Runs runtime commands; defaults to subprocess.run, tests can pass a stub
+        self._run = runner or subprocess.run
         self._internal_network_name = 'box-internal'
+        self._ensured = False
 
     def get_network_args(self, args) -> Tuple[List[str], Optional[Dict[str, str]]]:
         """Generate network arguments and environment variables for container runtime"""
@@ -727,16 +985,25 @@ class NetworkManager:
 
     def _ensure_internal_network(self) -> None:
         """Create internal network if it doesn't exist"""
-        # Check if network exists
-        check_result = subprocess.run(
-            [self.runtime.runtime, 'network', 'inspect', self._internal_network_name],
-            capture_output=True
+        if self._ensured:
+            return
+        self._ensured = True
+
+        # Check if network exists; unlike inspect, ls succeeds quietly when it doesn't
+        check_result = self._run(
+            [
+                self.runtime.runtime, 'network', 'ls',
+                '--filter', f'name=^{self._internal_network_name}$',
+                '--format', '{{.Name}}'
+            ],
+            capture_output=True,
+            text=True
         )
 
-        if check_result.returncode != 0:
+        if self._internal_network_name not in check_result.stdout.split():
             # Network doesn't exist, create it
             print(f"Creating internal network: {self._internal_network_name}")
-            create_result = subprocess.run([
+            create_result = self._run([
                 self.runtime.runtime, 'network', 'create',
                 '--internal',
                 self._internal_network_name
@@ -747,54 +1014,89 @@ class NetworkManager:
 
     def format_env_args(self, env_vars: Dict[str, str]) -> List[str]:
         """Convert environment variables dict to container runtime args"""
-        env_args = []
-        for key, value in env_vars.items():
-            env_args.extend(['-e', f'{key}={value}'])
-        return env_args
+        return [arg for key, value in env_vars.items() for arg in ('-e', f'{key}={value}')]
 
 
-def parse_args():
-    """Parse command line arguments with smart command detection"""
-    # First, separate flags from command
-    import sys
-    args = sys.argv[1:]
-    
-    flags = []
-    command = []
-    command_started = False
-    
-    i = 0
-    while i < len(args):
-        arg = args[i]
-        
-        # If we've started collecting command, everything goes to command
-        if command_started:
-            command.append(arg)
-            i += 1
-            continue
-        
-        # Check if this is a flag
-        if arg.startswith('-'):
-            flags.append(arg)
-            
-            # Check if this flag expects a value
-            if arg in ['-V', '--image-version', '-p', '--port', '-ro', '--read-only', '-rw', '--read-write', '-n', '--name', '-i', '--image', '--http-proxy']:
-                # Add the next argument as the flag value
-                if i + 1 < len(args) and not args[i + 1].startswith('-'):
-                    i += 1
-                    flags.append(args[i])
-        else:
-            # This is the start of the command
-            command_started = True
-            command.append(arg)
-        
-        i += 1
-    
-    # Parse flags using argparse
-    parser = argparse.ArgumentParser(
-        description='Box - Create isolated CLI sessions within Docker or Podman containers',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+class DaemonManager:
+    """Handle long-lived containers that commands are exec'd into (--daemon)"""
+
+    def __init__(self, runtime: 'ContainerRuntime'):
+        self.runtime = runtime
+
+    @staticmethod
+    def get_container_name(image: str, container_args: List[str], image_id: Optional[str] = None) -> str:
+        """Derive a stable container name from the image, its ID and its run options"""
+        # Named images keep their name across rebuilds, so the ID tells the builds apart
+        digest = hashlib.sha256('\0'.join([image, image_id or ''] + container_args).encode()).hexdigest()[:12]
+        return f'box-daemon-{digest}'
+
+    def is_running(self, container_name: str) -> bool:
+        """Check if a container with exactly this name is running"""
+        result = subprocess.run(
+            [self.runtime.runtime, 'ps', '--filter', f'name=^{container_name}$', '--format', '{{.Names}}'],
+            capture_output=True,
+            text=True
+        )
+        return result.returncode == 0 and container_name in result.stdout.split()
+
+    def ensure_running(self, container_name: str, image: str, container_args: List[str]) -> bool:
+        """Start the background container unless it is already running"""
+        if self.is_running(container_name):
+            return True
+
+        print(f"Starting background container: {container_name}")
+        # Keep the container alive with a process that just waits
+        result = subprocess.run(
+            [self.runtime.runtime, 'run', '-d', '--rm', '--name', container_name]
+            + container_args
+            + ['--entrypoint', 'tail', image, '-f', '/dev/null'],
+            capture_output=True,
+            text=True
+        )
+
+        if result.returncode != 0:
+            print(f"✗ Failed to start background container: {result.stderr.strip()}", file=sys.stderr)
+            return False
+
+        print(f"Stop it with: {self.runtime.name} rm -f {container_name}")
+        return True
+
+
+def build_container_command(args, first_mount_dir: Optional[str]) -> List[str]:
+    """Build the command run inside the container, starting in the first mounted directory"""
+    if args.tmux:
+        tmux_cmd = ['tmux', 'new-session', '-s', 'main', '-n', 'box']
+        if args.daemon:
+            # Every exec into a background container shares its tmux server, so attach if the session exists
+            tmux_cmd.insert(2, '-A')
+        if args.command:
+            # tmux runs the command through its own shell, so it is passed as one string
+            tmux_cmd.append(_quote_command(args.command))
+        if not first_mount_dir:
+            # No shell needed to start tmux directly
+            return tmux_cmd
+        shell_cmd = 'exec ' + _quote_command(tmux_cmd)
+    elif args.command:
+        if not first_mount_dir:
+            return list(args.command)
+        shell_cmd = 'exec ' + _quote_command(args.command)
+    else:
+        # Start an interactive bash shell
+        if not first_mount_dir:
+            return ['/bin/bash']
+        shell_cmd = 'exec /bin/bash'
+
+    if first_mount_dir:
+        shell_cmd = f'cd {shlex.quote(first_mount_dir)} 2>/dev/null || cd /root; {shell_cmd}'
+    return ['/bin/sh', '-c', shell_cmd]
+
+
+def _quote_command(command: List[str]) -> str:
+    """Join a command into a shell string, quoting each argument (shlex.join needs 3.8)"""
+    return ' '.join(shlex.quote(arg) for arg in command)
+
+
+_EPILOG = """
 Examples:
   box npm install                          # Auto-detect and run npm install
   box -V 3.9 python script.py              # Run Python script in Python 3.9 container
@@ -808,7 +1110,21 @@ Examples:
   box -N python analyze.py                 # Run with no network access
   box --internal-network bash              # Run with internal network only (no internet)
   box --http-proxy http://proxy:3128 curl example.com  # Use HTTP proxy for requests
-        """
+  box --daemon -rw . npm test              # Reuse a background container for repeated commands
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _build_parser() -> 'argparse.ArgumentParser':
+    """Build the argument parser, once per process"""
+    # Imported here so that importing box.cli stays cheap
+    import argparse
+
+    # Box flags come first; everything from the first positional on is the command
+    parser = argparse.ArgumentParser(
+        description='Box - Create isolated CLI sessions within Docker or Podman containers',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG
     )
     
     # Base image selection
@@ -911,11 +1227,30 @@ Examples:
         help='Use HTTP proxy for container network access (e.g., http://proxy:3128)'
     )
 
-    # Parse just the flags
-    parsed_args = parser.parse_args(flags)
+    # Persistent container mode
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Keep the container running in the background and run commands in it with exec'
+    )
+
+    # Command to run, including any flags meant for it
+    parser.add_argument(
+        'command',
+        nargs=argparse.REMAINDER,
+        help='Command to run in the container (default: interactive shell)'
+    )
+
+    return parser
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    """Parse command line arguments (sys.argv[1:] by default) with smart command detection"""
+    parsed_args = _build_parser().parse_args(argv)
     
-    # Add the command manually
-    parsed_args.command = command
+    # An explicit '--' only separates box flags from the command
+    if parsed_args.command[:1] == ['--']:
+        parsed_args.command = parsed_args.command[1:]
     
     return parsed_args
 
@@ -930,41 +1265,28 @@ def main():
     """Main entry point"""
     args = parse_args()
     
+    # Handle list command; it only reads saved configuration
+    if args.list:
+        ConfigManager().display_named_images()
+        sys.exit(0)
+    
     # Initialize container runtime
     runtime = ContainerRuntime()
     
-    # Initialize config manager
-    config_manager = ConfigManager()
-    
-    # Initialize image builder with config manager
-    image_builder = ImageBuilder(runtime, config_manager)
-    
-    # Initialize volume mapper
-    volume_mapper = VolumeMapper(runtime)
-
-    # Initialize network manager
-    network_manager = NetworkManager(runtime)
-
-    # Check if we need SSH mounts
-    has_ssh_mounts = False
-    if args.read_only:
-        has_ssh_mounts = any(SSHFSManager.is_ssh_url(spec) for spec in args.read_only)
-    if not has_ssh_mounts and args.read_write:
-        has_ssh_mounts = any(SSHFSManager.is_ssh_url(spec) for spec in args.read_write)
-    
-    # Handle cleanup command
+    # Handle cleanup command before setting up anything else
     if args.clean:
-        image_builder.clean_box_images()
+        ImageBuilder(runtime).clean_box_images()
         sys.exit(0)
     
-    # Handle list command
-    if args.list:
-        config_manager.display_named_images()
-        sys.exit(0)
+    # Initialize config manager only when named images are involved
+    config_manager = ConfigManager() if (args.name or args.image) else None
+    
+    # Initialize image builder with config manager
+    image_builder = ImageBuilder(runtime, config_manager)
     
     # Check if we're creating a named image and handle confirmation early
-    if hasattr(args, 'name') and args.name:
-        force = hasattr(args, 'force') and args.force
+    if args.name:
+        force = args.force
         
         # Auto-detect environment from command if not explicitly specified
         if not args.node and not args.py and args.command:
@@ -999,7 +1321,7 @@ def main():
             target_image_name = image_builder.get_box_image_name(base_image, args.tmux, args.name)
             
             # Build the named image with the command
-            if image_builder.build_named_image_with_command(args.name, config, target_image_name):
+            if image_builder.build_named_image_with_command(args.name, config, target_image_name, base_image):
                 print(f"✓ Named image '{args.name}' is ready!")
                 print(f"Use with: box -i {args.name} [new-command]")
                 sys.exit(0)
@@ -1011,7 +1333,7 @@ def main():
             print(f"Use with: box -i {args.name}")
     
     # Handle named image usage
-    if hasattr(args, 'image') and args.image:
+    if args.image:
         # Load configuration for named image
         config = config_manager.get_image_config(args.image)
         if not config:
@@ -1045,12 +1367,9 @@ def main():
             args.read_write = saved_rw
         
         # Apply saved network configuration (only if not overridden by user)
-        if not hasattr(args, 'no_network') or not args.no_network:
-            args.no_network = config.get('no_network', False)
-        if not hasattr(args, 'internal_network') or not args.internal_network:
-            args.internal_network = config.get('internal_network', False)
-        if not hasattr(args, 'http_proxy') or not args.http_proxy:
-            args.http_proxy = config.get('http_proxy')
+        args.no_network = args.no_network or config.get('no_network', False)
+        args.internal_network = args.internal_network or config.get('internal_network', False)
+        args.http_proxy = args.http_proxy or config.get('http_proxy')
 
         # Only use saved command if no command was provided by user
         if not args.command:
@@ -1059,65 +1378,45 @@ def main():
         # Get/build the image normally, including sshfs if needed
         image = image_builder.get_or_build_image(args)
     
-    # Build container run command
-    run_args = ['run', '--rm', '-it']
+    # SSHFS mounts are unmounted when box exits, which would pull them out from under a daemon
+    if args.daemon and any(map(_is_ssh_spec, itertools.chain(args.read_only or (), args.read_write or ()))):
+        print("Error: SSH mounts cannot be used with --daemon", file=sys.stderr)
+        sys.exit(1)
     
-    # Add volume mounts and get first mounted directory
-    volume_args, first_mount_dir = volume_mapper.get_volume_args(args)
-    run_args.extend(volume_args)
-    
-    # Add port mappings
-    run_args.extend(PortMapper.get_port_args(args))
+    # Initialize volume mapper
+    volume_mapper = VolumeMapper(runtime)
 
-    # Add network configuration
-    network_args, env_vars = network_manager.get_network_args(args)
-    run_args.extend(network_args)
+    # Initialize network manager
+    network_manager = NetworkManager(runtime)
 
-    # Add environment variables for proxy support
-    if env_vars:
-        run_args.extend(network_manager.format_env_args(env_vars))
+    # Volume mounts (and the first mounted directory), network configuration
+    # and proxy environment variables
+    volume_args, first_mount_dir = volume_mapper.get_volume_args(args)
+    network_args, env_vars = network_manager.get_network_args(args)
+    env_args = network_manager.format_env_args(env_vars) if env_vars else []
 
-    # Add image
-    run_args.append(image)
+    # Collect container options
+    container_args = [*volume_args, *PortMapper.get_port_args(args), *network_args, *env_args]
     
     # Set working directory if we have mounts (but let container handle it to avoid -w issues)
     # We'll use cd in the command instead of -w flag for better compatibility
+    container_command = build_container_command(args, first_mount_dir)
     
-    # Add command execution
-    if args.tmux:
-        if args.command:
-            # For commands, run them in tmux with working directory
-            inner_command = ' '.join(args.command)
-            if first_mount_dir:
-                bash_cmd = f'cd {first_mount_dir} 2>/dev/null || cd /root; tmux new-session -s main -n box "{inner_command}"'
-            else:
-                bash_cmd = f'tmux new-session -s main -n box "{inner_command}"'
-            run_args.extend(['/bin/bash', '-c', bash_cmd])
-        else:
-            # For interactive shells, start tmux with bash
-            if first_mount_dir:
-                bash_cmd = f'cd {first_mount_dir} 2>/dev/null || cd /root; tmux new-session -s main -n box'
-            else:
-                bash_cmd = 'tmux new-session -s main -n box'
-            run_args.extend(['/bin/bash', '-c', bash_cmd])
+    if args.daemon:
+        # Run the command inside a long-lived container, starting it if needed
+        daemon_manager = DaemonManager(runtime)
+        container_name = daemon_manager.get_container_name(image, container_args, image_builder.get_image_id(image))
+        if not daemon_manager.ensure_running(container_name, image, container_args):
+            sys.exit(1)
+        run_args = ['exec', '-it', container_name, *container_command]
     else:
-        # Run directly without tmux
-        if args.command:
-            # Execute the command directly with working directory
-            if first_mount_dir:
-                bash_cmd = f'cd {first_mount_dir} 2>/dev/null || cd /root; ' + ' '.join(args.command)
-                run_args.extend(['/bin/bash', '-c', bash_cmd])
-            else:
-                run_args.extend(args.command)
-        else:
-            # Start an interactive bash shell
-            if first_mount_dir:
-                bash_cmd = f'cd {first_mount_dir} 2>/dev/null || cd /root; exec /bin/bash'
-                run_args.extend(['/bin/bash', '-c', bash_cmd])
-            else:
-                run_args.extend(['/bin/bash'])
+        run_args = ['run', '--rm', '-it', *container_args, image, *container_command]
     
     # Execute container
+    if os.name == 'posix' and not volume_mapper.has_ssh_mounts():
+        # Nothing to clean up afterwards, so hand the process over to the runtime
+        runtime.exec_command(run_args)
+    
     try:
         result = runtime.run_command(run_args)
         return_code = result.returncode
@@ -1129,8 +1428,7 @@ def main():
         return_code = 1
     finally:
         # Clean up SSH mounts
-        if 'volume_mapper' in locals() and hasattr(volume_mapper, 'sshfs_mgr'):
-            volume_mapper.sshfs_mgr.cleanup_mounts()
+        volume_mapper.cleanup_ssh_mounts()
     
     sys.exit(return_code)
 
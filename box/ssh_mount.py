@@ -1,28 +1,85 @@
 #!/usr/bin/env python3
 """SSH mounting utilities for Box CLI"""
 
+import functools
+import os
 import shutil
 import subprocess
+import threading
 import re
 import atexit
 from pathlib import Path
 from typing import Optional, Tuple, List
 
 
+# SSH URL pattern: user@host:path or host:path
+_SSH_URL_RE = re.compile(r'^([^@]+@)?[^:/@]+:[^:]+$')
+
+
+@functools.lru_cache(maxsize=None)
+def which(name: str) -> Optional[str]:
+    """Look up an executable on PATH, once per process"""
+    return shutil.which(name)
+
+
+@functools.lru_cache(maxsize=None)
+def is_darwin() -> bool:
+    """Check if we are running on macOS, once per process"""
+    import platform
+    return platform.system() == 'Darwin'
+
+
+def _list_dir_with_timeout(path: str, timeout: float) -> List[str]:
+    """List a directory, raising TimeoutError if it does not answer in time"""
+    # A dead SSHFS mount can hang any access to it, so list it from a daemon
+    # thread that is simply abandoned if it does not finish
+    outcome = []
+    
+    def list_dir():
+        try:
+            outcome.append(os.listdir(path))
+        except OSError as e:
+            outcome.append(e)
+    
+    thread = threading.Thread(target=list_dir, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    
+    if not outcome:
+        raise TimeoutError(f"listing {path} timed out after {timeout}s")
+    if isinstance(outcome[0], OSError):
+        raise outcome[0]
+    return outcome[0]
+
+
 class SSHFSManager:
     """Manage SSHFS mounts on host system using fuse-t"""
     
+    # sshfs -o options for better compatibility and debugging
+    _SSHFS_OPTIONS = ','.join([
+        'StrictHostKeyChecking=accept-new',
+        'ConnectTimeout=10',          # Faster timeout for connection
+        'ServerAliveInterval=15',     # Keep connection alive
+        'ServerAliveCountMax=3',      # Max missed keepalives
+        'follow_symlinks',            # Follow symbolic links
+        'auto_cache',                 # Enable caching
+        'kernel_cache',               # Use kernel cache
+        'reconnect',                  # Auto-reconnect on connection loss
+    ])
+    _SSHFS_OPTIONS_RO = _SSHFS_OPTIONS + ',ro'
+    
     def __init__(self):
-        self.ssh_mounts = []  # Track SSH mount info: (local_path, remote_spec, is_mounted)
-        atexit.register(self.cleanup_mounts)
+        self.ssh_mounts = {}  # Track SSH mount info: local_path -> (remote_spec, is_mounted)
+        # Threads cannot be started during interpreter shutdown, so unmount one by one at exit
+        atexit.register(self.cleanup_mounts, parallel=False)
     
     def check_sshfs_available(self) -> bool:
         """Check if fuse-t-sshfs is available, try to install if not found"""
-        if shutil.which('sshfs') is not None:
+        if which('sshfs') is not None:
             return True
         
         # Try to auto-install if brew is available
-        if shutil.which('brew') is not None:
+        if which('brew') is not None:
             print("sshfs not found. fuse-t and fuse-t-sshfs are required for SSH mounting.")
             response = input("Install via Homebrew? [Y/n]: ").strip().lower()
             
@@ -40,7 +97,8 @@ class SSHFSManager:
                     if result.returncode == 0:
                         print("✓ Successfully installed fuse-t and fuse-t-sshfs")
                         # Check again after installation
-                        return shutil.which('sshfs') is not None
+                        which.cache_clear()
+                        return which('sshfs') is not None
                     else:
                         print(f"✗ Failed to install fuse-t: {result.stderr}")
                         
@@ -77,24 +135,8 @@ class SSHFSManager:
         remote_target = f"{user}@{host}:{remote_path}" if user else f"{host}:{remote_path}"
         sshfs_cmd = ['sshfs', remote_target, str(local_mount_path)]
         
-        # Add options for better compatibility and debugging
-        sshfs_options = [
-            'StrictHostKeyChecking=accept-new',
-            'ConnectTimeout=10',          # Faster timeout for connection
-            'ServerAliveInterval=15',     # Keep connection alive
-            'ServerAliveCountMax=3',      # Max missed keepalives
-            'follow_symlinks',            # Follow symbolic links
-            'auto_cache',                 # Enable caching
-            'kernel_cache',               # Use kernel cache
-            'reconnect',                  # Auto-reconnect on connection loss
-        ]
-        
-        # Add read-only option if specified
-        if read_only:
-            sshfs_options.append('ro')
-        
-        # Join all options
-        sshfs_cmd.extend(['-o', ','.join(sshfs_options)])
+        # Add options, with the read-only flag if specified
+        sshfs_cmd.extend(['-o', self._SSHFS_OPTIONS_RO if read_only else self._SSHFS_OPTIONS])
         
         print(f"Mounting {remote_target} to {local_mount_path}...")
         
@@ -111,27 +153,21 @@ class SSHFSManager:
                 # Verify mount actually worked by testing directory access
                 try:
                     # Try to list the mounted directory
-                    test_result = subprocess.run(
-                        ['ls', '-la', str(local_mount_path)],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
+                    _list_dir_with_timeout(str(local_mount_path), timeout=5)
                     
-                    if test_result.returncode == 0:
-                        print(f"✓ SSH mount successful: {remote_target} -> {local_mount_path}")
-                        self.ssh_mounts.append((str(local_mount_path), ssh_spec, True))
-                        return str(local_mount_path)
-                    else:
-                        print(f"✗ SSH mount appeared to succeed but directory is not accessible")
-                        print(f"  Verification error: {test_result.stderr}")
-                        # Try to unmount
-                        subprocess.run(['umount', str(local_mount_path)], capture_output=True)
-                        return None
+                    print(f"✓ SSH mount successful: {remote_target} -> {local_mount_path}")
+                    self.ssh_mounts[str(local_mount_path)] = (ssh_spec, True)
+                    return str(local_mount_path)
                         
-                except subprocess.TimeoutExpired:
+                except TimeoutError:
                     print(f"✗ SSH mount verification timed out")
                     return None
+                except OSError as e:
+                    print(f"✗ SSH mount appeared to succeed but directory is not accessible")
+                    print(f"  Verification error: {e}")
+                    # Try to unmount
+                    subprocess.run(['umount', str(local_mount_path)], capture_output=True)
+                    return None
                 except Exception as e:
                     print(f"✗ SSH mount verification failed: {e}")
                     return None
@@ -158,6 +194,7 @@ class SSHFSManager:
             return None
     
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def parse_ssh_url(spec: str) -> Tuple[Optional[str], str, str]:
         """Parse SSH URL into user, host, and remote path"""
         if '@' in spec:
@@ -169,24 +206,21 @@ class SSHFSManager:
         return user, host, remote_path
     
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def is_ssh_url(spec: str) -> bool:
         """Check if the spec is an SSH URL"""
-        # Pattern: user@host:path or host:path
-        ssh_pattern = r'^([^@]+@)?[^:/@]+:[^:]+$'
-        return bool(re.match(ssh_pattern, spec)) and not spec.startswith('/') and not (len(spec) > 1 and spec[1:3] == ':\\')
+        return bool(_SSH_URL_RE.match(spec)) and not spec.startswith('/') and spec[1:3] != ':\\'
     
     def unmount_ssh_path(self, local_path: str) -> bool:
         """Unmount a specific SSH mount using macOS-preferred methods"""
-        import platform
-        
         try:
             # On macOS, try diskutil unmount first (preferred method)
-            if platform.system() == 'Darwin':
+            if is_darwin():
                 result = subprocess.run(['diskutil', 'unmount', local_path], capture_output=True, timeout=10, text=True)
                 if result.returncode == 0:
                     print(f"✓ Unmounted {local_path}")
                     # Remove from tracking
-                    self.ssh_mounts = [(p, r, m) for p, r, m in self.ssh_mounts if p != local_path]
+                    self.ssh_mounts.pop(local_path, None)
                     return True
                 
                 # If diskutil fails, try force unmount
@@ -194,7 +228,7 @@ class SSHFSManager:
                 if result.returncode == 0:
                     print(f"✓ Force unmounted {local_path}")
                     # Remove from tracking
-                    self.ssh_mounts = [(p, r, m) for p, r, m in self.ssh_mounts if p != local_path]
+                    self.ssh_mounts.pop(local_path, None)
                     return True
             
             # Fallback to standard umount (macOS and Linux)
@@ -202,16 +236,16 @@ class SSHFSManager:
             if result.returncode == 0:
                 print(f"✓ Unmounted {local_path}")
                 # Remove from tracking
-                self.ssh_mounts = [(p, r, m) for p, r, m in self.ssh_mounts if p != local_path]
+                self.ssh_mounts.pop(local_path, None)
                 return True
             
             # Try fusermount as last resort (Linux only)
-            if shutil.which('fusermount'):
+            if which('fusermount'):
                 result = subprocess.run(['fusermount', '-u', local_path], capture_output=True, timeout=5, text=True)
                 if result.returncode == 0:
                     print(f"✓ Unmounted {local_path}")
                     # Remove from tracking
-                    self.ssh_mounts = [(p, r, m) for p, r, m in self.ssh_mounts if p != local_path]
+                    self.ssh_mounts.pop(local_path, None)
                     return True
             
             print(f"✗ Failed to unmount {local_path}")
@@ -225,59 +259,73 @@ class SSHFSManager:
     
     def list_mounts(self) -> List[Tuple[str, str]]:
         """List all active SSH mounts"""
-        return [(local_path, remote_spec) for local_path, remote_spec, is_mounted in self.ssh_mounts if is_mounted]
+        return [(local_path, remote_spec) for local_path, (remote_spec, is_mounted) in self.ssh_mounts.items() if is_mounted]
     
-    def cleanup_mounts(self):
-        """Clean up all SSH mounts"""
-        import platform
+    def cleanup_mounts(self, parallel: bool = True):
+        """Clean up all SSH mounts, unmounting them concurrently unless parallel is False"""
+        mounts = self.list_mounts()
         
-        for local_path, remote_spec, is_mounted in self.ssh_mounts:
-            if is_mounted:
-                try:
-                    # Use the same unmount logic as unmount_ssh_path
-                    unmounted = False
-                    
-                    # On macOS, try diskutil first
-                    if platform.system() == 'Darwin':
-                        result = subprocess.run(['diskutil', 'unmount', local_path], 
-                                             capture_output=True, timeout=5)
-                        if result.returncode == 0:
-                            unmounted = True
-                        else:
-                            # Try force unmount
-                            result = subprocess.run(['diskutil', 'unmount', 'force', local_path], 
-                                                 capture_output=True, timeout=5)
-                            if result.returncode == 0:
-                                unmounted = True
-                    
-                    # Fallback to standard umount
-                    if not unmounted:
-                        result = subprocess.run(['umount', local_path], 
-                                             capture_output=True, timeout=5)
-                        if result.returncode == 0:
-                            unmounted = True
-                    
-                    # Try fusermount as last resort (Linux)
-                    if not unmounted and shutil.which('fusermount'):
-                        result = subprocess.run(['fusermount', '-u', local_path], 
-                                             capture_output=True, timeout=5)
-                        if result.returncode == 0:
-                            unmounted = True
-                    
-                    if unmounted:
-                        print(f"✓ Unmounted {remote_spec}")
-                    
-                except:
-                    # Silent failure during cleanup
-                    pass
-                
-                # Remove empty mount directory if it was auto-generated
-                try:
-                    mount_base = Path.home() / '.box-cli' / 'ssh-mounts'
-                    local_path_obj = Path(local_path)
-                    if local_path_obj.parent == mount_base:
-                        local_path_obj.rmdir()
-                except:
-                    pass
+        if len(mounts) == 1 or not parallel:
+            for mount in mounts:
+                self._unmount_one(mount)
+        elif mounts:
+            # Each unmount can block for seconds, so run them side by side
+            threads = [threading.Thread(target=self._unmount_one, args=(mount,)) for mount in mounts]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        self.ssh_mounts.clear()
+    
+    def _unmount_one(self, mount: Tuple[str, str]) -> bool:
+        """Unmount one SSH mount during cleanup and remove its auto-generated directory"""
+        local_path, remote_spec = mount
+        unmounted = False
+        
+        try:
+            # Use the same unmount logic as unmount_ssh_path
+            # On macOS, try diskutil first
+            if is_darwin():
+                result = subprocess.run(['diskutil', 'unmount', local_path], 
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
+                if result.returncode == 0:
+                    unmounted = True
+                else:
+                    # Try force unmount
+                    result = subprocess.run(['diskutil', 'unmount', 'force', local_path], 
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
+                    if result.returncode == 0:
+                        unmounted = True
+            
+            # Fallback to standard umount
+            if not unmounted:
+                result = subprocess.run(['umount', local_path], 
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
+                if result.returncode == 0:
+                    unmounted = True
+            
+            # Try fusermount as last resort (Linux)
+            if not unmounted and which('fusermount'):
+                result = subprocess.run(['fusermount', '-u', local_path], 
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
+                if result.returncode == 0:
+                    unmounted = True
+            
+            if unmounted:
+                print(f"✓ Unmounted {remote_spec}")
+            
+        except:
+            # Silent failure during cleanup
+            pass
+        
+        # Remove empty mount directory if it was auto-generated
+        try:
+            mount_base = Path.home() / '.box-cli' / 'ssh-mounts'
+            local_path_obj = Path(local_path)
+            if local_path_obj.parent == mount_base:
+                local_path_obj.rmdir()
+        except:
+            pass
         
-        self.ssh_mounts.clear()
\ No newline at end of file
+        return unmounted
@@ -1,17 +1,22 @@
 #!/usr/bin/env python3
 """box_sshfs - Standalone SSH filesystem mounting utility"""
 
-import argparse
 import sys
 import signal
 import subprocess
 import time
 from pathlib import Path
-from .ssh_mount import SSHFSManager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .ssh_mount import SSHFSManager
 
 
 def parse_args():
     """Parse command line arguments for box_sshfs"""
+    # Imported here so that the flag-only fast paths in main() skip it
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='Mount remote directories over SSH using SSHFS',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -77,8 +82,43 @@ Note: When mounting, the command stays running. Press Ctrl+C to unmount and exit
     return parser.parse_args()
 
 
+def _list_mounts(ssh_mgr: 'SSHFSManager') -> int:
+    """Print the active SSH mounts"""
+    mounts = ssh_mgr.list_mounts()
+    if not mounts:
+        print("No active SSH mounts found.")
+        return 0
+    
+    print("Active SSH mounts:")
+    for local_path, remote_spec in mounts:
+        print(f"  {remote_spec} -> {local_path}")
+    return 0
+
+
+def _cleanup_mounts(ssh_mgr: 'SSHFSManager') -> int:
+    """Unmount all SSH mounts"""
+    ssh_mgr.cleanup_mounts()
+    print("All SSH mounts cleaned up.")
+    return 0
+
+
+# Invocations that need no argument validation, so argparse is never built for them
+_FAST_PATHS = {
+    ('--list',): _list_mounts,
+    ('-l',): _list_mounts,
+    ('--cleanup',): _cleanup_mounts,
+    ('-c',): _cleanup_mounts,
+}
+
+
 def main():
     """Main entry point for box_sshfs"""
+    from .ssh_mount import SSHFSManager, is_darwin, which
+    
+    fast_path = _FAST_PATHS.get(tuple(sys.argv[1:]))
+    if fast_path:
+        return fast_path(SSHFSManager())
+    
     args = parse_args()
     
     # Initialize SSH manager
@@ -86,15 +126,7 @@ def main():
     
     # Handle list command
     if args.list:
-        mounts = ssh_mgr.list_mounts()
-        if not mounts:
-            print("No active SSH mounts found.")
-            return 0
-        
-        print("Active SSH mounts:")
-        for local_path, remote_spec in mounts:
-            print(f"  {remote_spec} -> {local_path}")
-        return 0
+        return _list_mounts(ssh_mgr)
     
     # Handle unmount command
     if args.unmount:
@@ -106,9 +138,7 @@ def main():
     
     # Handle cleanup command
     if args.cleanup:
-        ssh_mgr.cleanup_mounts()
-        print("All SSH mounts cleaned up.")
-        return 0
+        return _cleanup_mounts(ssh_mgr)
     
     # Handle mount command
     if not args.remote_spec:
@@ -132,15 +162,15 @@ def main():
         if not local_mount_point:
             local_mount_point = "ssh_mount"
     
-    # Create a new SSH manager instance for this mount
-    mount_mgr = SSHFSManager()
-    
     # Track the mount path for cleanup
     mount_path = None
     
+    # Resolved up front so the signal handler does no imports or platform probing
+    on_macos = is_darwin()
+    has_fusermount = not on_macos and which('fusermount') is not None
+    
     def signal_handler(signum, frame):
         """Handle Ctrl+C to unmount and exit gracefully"""
-        import platform
         print("\n🛑 Received interrupt signal, unmounting...")
         if mount_path:
             # Try manual unmount using macOS-preferred method
@@ -148,19 +178,25 @@ def main():
                 unmounted = False
                 
                 # On macOS, use diskutil first
-                if platform.system() == 'Darwin':
-                    result = subprocess.run(['diskutil', 'unmount', mount_path], capture_output=True, timeout=5, text=True)
+                if on_macos:
+                    result = subprocess.run(['diskutil', 'unmount', mount_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
                     if result.returncode == 0:
                         unmounted = True
                     else:
                         # Try force unmount if regular fails
-                        result = subprocess.run(['diskutil', 'unmount', 'force', mount_path], capture_output=True, timeout=5, text=True)
+                        result = subprocess.run(['diskutil', 'unmount', 'force', mount_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
                         if result.returncode == 0:
                             unmounted = True
                 
+                # On Linux, lazily detach the FUSE mount; this needs no root and returns at once
+                if has_fusermount:
+                    result = subprocess.run(['fusermount', '-u', '-z', mount_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
+                    if result.returncode == 0:
+                        unmounted = True
+                
                 # Fallback to umount
                 if not unmounted:
-                    result = subprocess.run(['umount', mount_path], capture_output=True, timeout=5, text=True)
+                    result = subprocess.run(['umount', mount_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
                     if result.returncode == 0:
                         unmounted = True
                 
@@ -177,7 +213,7 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
     
     # Create the mount
-    mount_path = mount_mgr.create_ssh_mount(
+    mount_path = ssh_mgr.create_ssh_mount(
         args.remote_spec,
         read_only=args.read_only,
         mount_point=local_mount_point
@@ -195,14 +231,22 @@ def main():
     
     # Stay running and keep the mount alive
     try:
-        print("📁 Mount active - Press Ctrl+C to unmount and exit")
-        print(f"   Remote: {args.remote_spec}")
-        print(f"   Local:  {mount_path}")
-        print("")
+        # One write for the whole banner
+        sys.stdout.write(
+            "📁 Mount active - Press Ctrl+C to unmount and exit\n"
+            f"   Remote: {args.remote_spec}\n"
+            f"   Local:  {mount_path}\n"
+            "\n"
+        )
+        sys.stdout.flush()
         
-        # Keep running until interrupted
+        # Keep running until interrupted, sleeping in the kernel until a signal arrives
         while True:
-            time.sleep(1)
+            if hasattr(signal, 'pause'):
+                signal.pause()
+            else:
+                # Windows has no signal.pause
+                time.sleep(1)
     except KeyboardInterrupt:
         signal_handler(signal.SIGINT, None)
     
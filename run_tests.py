@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 """Test runner for Box CLI"""
 
+import importlib.util
+import subprocess
 import sys
 import unittest
 
 def run_tests():
     """Run all tests with verbose output"""
+    # Spread the tests across all cores when pytest-xdist is installed
+    if importlib.util.find_spec('xdist') is not None:
+        return subprocess.call([sys.executable, '-m', 'pytest', '-n', 'auto', 'tests/', '-v'])
+    
     # Discover and run all tests
     loader = unittest.TestLoader()
     suite = loader.discover('tests', pattern='test*.py')
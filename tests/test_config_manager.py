@@ -6,7 +6,8 @@ import json
 import tempfile
 import shutil
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch
 import sys
 import os
 
@@ -19,24 +20,23 @@ from box.cli import ConfigManager
 class BaseTestCase(unittest.TestCase):
     """Base test case with common setup and utilities"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Create one temporary home directory for the whole test class"""
+        # Keep test files in memory where a tmpfs is available
+        cls.test_dir = tempfile.mkdtemp(dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+        cls.config_dir = Path(cls.test_dir) / '.box-cli'
+        cls.config_file = cls.config_dir / 'config.json'
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the temporary home directory"""
+        shutil.rmtree(cls.test_dir, ignore_errors=True)
+    
     def setUp(self):
         """Set up test fixtures"""
-        # Create a temporary directory for test configs
-        self.test_dir = tempfile.mkdtemp()
-        self.config_dir = Path(self.test_dir) / '.box-cli'
-        self.config_file = self.config_dir / 'config.json'
-        
-        # Patch the home directory to use our test directory
-        self.home_patcher = patch('box.cli.Path.home')
-        self.mock_home = self.home_patcher.start()
-        self.mock_home.return_value = Path(self.test_dir)
-    
-    def tearDown(self):
-        """Clean up test fixtures"""
-        self.home_patcher.stop()
-        # Clean up temporary directory
-        if os.path.exists(self.test_dir):
-            shutil.rmtree(self.test_dir)
+        # Start every test without a config directory
+        shutil.rmtree(self.config_dir, ignore_errors=True)
     
     def create_mock_args(self, **kwargs):
         """Create a mock args object with common defaults"""
@@ -51,28 +51,36 @@ class BaseTestCase(unittest.TestCase):
             'read_write': None,
             'no_network': False,
             'internal_network': False,
-            'http_proxy': None
+            'http_proxy': None,
+            'name': None
         }
         defaults.update(kwargs)
         
-        args = MagicMock()
-        for key, value in defaults.items():
-            setattr(args, key, value)
-        
-        return args
+        return SimpleNamespace(**defaults)
 
 
 class TestConfigManager(BaseTestCase):
     """Test cases for ConfigManager class"""
     
-    def test_init_creates_config_dir(self):
-        """Test that ConfigManager creates config directory if it doesn't exist"""
+    def test_init_does_not_touch_disk(self):
+        """Test that ConfigManager defers all file access until the config is used"""
+        with patch('builtins.open') as mock_open:
+            config_manager = ConfigManager(home_dir=self.test_dir)
+            mock_open.assert_not_called()
+        
+        self.assertFalse(self.config_dir.exists())
+        self.assertEqual(config_manager.config, {'images': {}})
+        self.assertFalse(self.config_dir.exists())
+    
+    def test_save_creates_config_dir(self):
+        """Test that saving creates the config directory if it doesn't exist"""
         self.assertFalse(self.config_dir.exists())
         
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
+        config_manager.save_image_config('test', self.create_mock_args(command=['test']))
         
-        self.assertTrue(self.config_dir.exists())
         self.assertTrue(self.config_dir.is_dir())
+        self.assertTrue(self.config_file.exists())
     
     def test_init_with_existing_config(self):
         """Test loading existing configuration"""
@@ -90,10 +98,25 @@ class TestConfigManager(BaseTestCase):
         with open(self.config_file, 'w') as f:
             json.dump(existing_config, f)
         
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         self.assertEqual(config_manager.config, existing_config)
     
+    def test_saved_change_is_seen_by_next_instance(self):
+        """Test that a saved change is visible to the next instance"""
+        config_manager = ConfigManager(home_dir=self.test_dir)
+        config_manager.save_image_config('other', self.create_mock_args(), force=True)
+        self.assertIn('other', ConfigManager(home_dir=self.test_dir).list_named_images())
+    
+    def test_load_config_without_orjson(self):
+        """Test that the config is parsed with the standard library when orjson is missing"""
+        self.config_dir.mkdir(parents=True)
+        with open(self.config_file, 'w') as f:
+            json.dump({'images': {'app': {'command': ['echo']}}}, f)
+        
+        with patch.dict(sys.modules, {'orjson': None}):
+            self.assertEqual(ConfigManager(home_dir=self.test_dir).list_named_images(), ['app'])
+    
     def test_init_with_corrupt_config(self):
         """Test handling of corrupt configuration file"""
         # Create config directory with corrupt JSON
@@ -101,14 +124,14 @@ class TestConfigManager(BaseTestCase):
         with open(self.config_file, 'w') as f:
             f.write("{ corrupt json")
         
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Should fall back to default config
         self.assertEqual(config_manager.config, {'images': {}})
     
     def test_save_image_config(self):
         """Test saving image configuration"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Create mock args object
         args = self.create_mock_args(
@@ -143,10 +166,23 @@ class TestConfigManager(BaseTestCase):
         with open(self.config_file, 'r') as f:
             file_config = json.load(f)
         self.assertEqual(file_config, config_manager.config)
+        
+        # Verify the temporary file was renamed into place
+        self.assertEqual(os.listdir(self.config_dir), ['config.json'])
+    
+    def test_save_config_without_orjson(self):
+        """Test that the config is saved with the standard library when orjson is missing"""
+        config_manager = ConfigManager(home_dir=self.test_dir)
+        
+        with patch.dict(sys.modules, {'orjson': None}):
+            config_manager.save_image_config('my-app', self.create_mock_args(command=['npm', 'start']))
+        
+        with open(self.config_file, 'r') as f:
+            self.assertEqual(json.load(f), config_manager.config)
     
     def test_save_image_config_with_none_values(self):
         """Test saving image configuration with None values for optional fields"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Create mock args object with None values
         args = self.create_mock_args(
@@ -163,7 +199,7 @@ class TestConfigManager(BaseTestCase):
     
     def test_get_image_config(self):
         """Test retrieving image configuration"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Add a test configuration
         test_config = {
@@ -188,7 +224,7 @@ class TestConfigManager(BaseTestCase):
     
     def test_list_named_images(self):
         """Test listing all named images"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Start with empty config
         self.assertEqual(config_manager.list_named_images(), [])
@@ -206,13 +242,15 @@ class TestConfigManager(BaseTestCase):
     
     def test_save_config_io_error(self):
         """Test handling of IO errors when saving config"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
-        # Make config file read-only to trigger IO error
+        # Make the config directory read-only so the temporary file cannot be
+        # created or renamed over config.json
         if not self.config_dir.exists():
             self.config_dir.mkdir(parents=True)
         self.config_file.touch()
-        os.chmod(self.config_file, 0o444)  # Read-only
+        os.chmod(self.config_dir, 0o555)
+        self.addCleanup(os.chmod, self.config_dir, 0o755)
         
         # Create mock args
         args = self.create_mock_args(command=['test'])
@@ -223,10 +261,58 @@ class TestConfigManager(BaseTestCase):
         
         # Config should still be updated in memory
         self.assertIn('test', config_manager.config['images'])
+        
+        # No temporary file is left behind next to the config
+        self.assertEqual(os.listdir(self.config_dir), ['config.json'])
+    
+    def test_failed_save_is_not_seen_by_later_instances(self):
+        """Test that an unsaved change does not leak into the shared config cache"""
+        ConfigManager(home_dir=self.test_dir).save_image_config('app', self.create_mock_args(), force=True)
+        
+        config_manager = ConfigManager(home_dir=self.test_dir)
+        self.assertEqual(config_manager.list_named_images(), ['app'])
+        with patch('box.cli.os.replace', side_effect=OSError('disk full')), patch('sys.stderr'):
+            config_manager.save_image_config('unsaved', self.create_mock_args(), force=True)
+        
+        self.assertEqual(ConfigManager(home_dir=self.test_dir).list_named_images(), ['app'])
+    
+    def test_save_keeps_file_mode(self):
+        """Test that saving keeps the permissions of the existing config file"""
+        self.config_dir.mkdir(parents=True)
+        self.config_file.write_text('{"images": {}}')
+        os.chmod(self.config_file, 0o640)
+        
+        ConfigManager(home_dir=self.test_dir).save_image_config('app', self.create_mock_args(), force=True)
+        
+        self.assertEqual(self.config_file.stat().st_mode & 0o777, 0o640)
+    
+    def test_save_new_file_honors_umask(self):
+        """Test that a newly created config file gets the umask's permissions"""
+        old_umask = os.umask(0o027)
+        self.addCleanup(os.umask, old_umask)
+        
+        ConfigManager(home_dir=self.test_dir).save_image_config('app', self.create_mock_args(), force=True)
+        
+        self.assertEqual(self.config_file.stat().st_mode & 0o777, 0o640)
+    
+    def test_save_writes_through_symlink(self):
+        """Test that a symlinked config file stays a symlink and its target is updated"""
+        dotfiles = Path(self.test_dir) / 'dotfiles'
+        dotfiles.mkdir(exist_ok=True)
+        self.addCleanup(shutil.rmtree, str(dotfiles), ignore_errors=True)
+        real_file = dotfiles / 'box.json'
+        real_file.write_text('{"images": {}}')
+        self.config_dir.mkdir(parents=True)
+        self.config_file.symlink_to(real_file)
+        
+        ConfigManager(home_dir=self.test_dir).save_image_config('app', self.create_mock_args(), force=True)
+        
+        self.assertTrue(self.config_file.is_symlink())
+        self.assertIn('app', json.loads(real_file.read_text())['images'])
     
     def test_overwrite_existing_config_with_force(self):
         """Test that saving with same name and force=True overwrites existing config"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Create initial config
         args1 = self.create_mock_args(
@@ -263,7 +349,7 @@ class TestConfigManager(BaseTestCase):
     
     def test_overwrite_confirmation_prompt(self):
         """Test confirmation prompt when overwriting existing config"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Create initial config
         args1 = self.create_mock_args(
@@ -305,7 +391,7 @@ class TestConfigManager(BaseTestCase):
 
     def test_network_configuration_saving_and_loading(self):
         """Test saving and loading network configuration options"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
 
         # Test no-network configuration
         args_no_net = self.create_mock_args(
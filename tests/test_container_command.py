@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Tests for building the container command and background containers"""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, MagicMock, patch
+from box.cli import DaemonManager, ContainerRuntime, ImageBuilder, build_container_command, parse_args
+
+
+class TestBuildContainerCommand(unittest.TestCase):
+    """Test the command run inside the container"""
+
+    def make_args(self, command=None, tmux=False, daemon=False):
+        """Create args with just the fields used by build_container_command"""
+        return SimpleNamespace(command=command or [], tmux=tmux, daemon=daemon)
+
+    def test_interactive_shell(self):
+        """Test that no command starts an interactive bash shell"""
+        self.assertEqual(build_container_command(self.make_args(), None), ['/bin/bash'])
+
+    def test_command_without_mounts_runs_directly(self):
+        """Test that a command without mounts is passed through unchanged"""
+        command = build_container_command(self.make_args(['npm', 'test']), None)
+        self.assertEqual(command, ['npm', 'test'])
+
+    def test_command_with_mount_changes_directory(self):
+        """Test that a command starts in the first mounted directory"""
+        command = build_container_command(self.make_args(['npm', 'test']), '/root/app')
+        self.assertEqual(command, ['/bin/sh', '-c', 'cd /root/app 2>/dev/null || cd /root; exec npm test'])
+
+    def test_command_arguments_are_quoted(self):
+        """Test that arguments with spaces or shell syntax reach the command intact"""
+        command = build_container_command(self.make_args(['echo', 'a b', '$HOME;']), '/root/my app')
+        self.assertEqual(
+            command[2],
+            "cd '/root/my app' 2>/dev/null || cd /root; exec echo 'a b' '$HOME;'"
+        )
+
+    def test_tmux_session(self):
+        """Test that tmux mode wraps the command in a tmux session"""
+        command = build_container_command(self.make_args(['python', '-c', 'print(1)'], tmux=True), None)
+        self.assertEqual(command, ['tmux', 'new-session', '-s', 'main', '-n', 'box', "python -c 'print(1)'"])
+
+    def test_daemon_tmux_attaches_to_existing_session(self):
+        """Test that repeated execs into a background container share one tmux session"""
+        command = build_container_command(self.make_args(tmux=True, daemon=True), None)
+        self.assertEqual(command, ['tmux', 'new-session', '-A', '-s', 'main', '-n', 'box'])
+
+    def test_tmux_shell_without_mounts_skips_bash(self):
+        """Test that an interactive tmux session is started without a bash wrapper"""
+        command = build_container_command(self.make_args(tmux=True), None)
+        self.assertEqual(command, ['tmux', 'new-session', '-s', 'main', '-n', 'box'])
+
+    def test_shell_wrapper_execs_tmux(self):
+        """Test that the bash wrapper is replaced by tmux rather than waiting on it"""
+        command = build_container_command(self.make_args(tmux=True), '/root/app')
+        self.assertIn('; exec tmux new-session', command[2])
+
+
+class TestCommandParsing(unittest.TestCase):
+    """Test separating box flags from the command"""
+
+    def test_command_flags_are_not_parsed_as_box_flags(self):
+        """Test that flags after the command belong to the command"""
+        args = parse_args(['-rw', '.', 'python', '-V', '-p', '80'])
+
+        self.assertEqual(args.read_write, ['.'])
+        self.assertIsNone(args.image_version)
+        self.assertIsNone(args.port)
+        self.assertEqual(args.command, ['python', '-V', '-p', '80'])
+
+    def test_double_dash_separator(self):
+        """Test that a leading '--' is dropped from the command"""
+        args = parse_args(['-t', '--', 'npm', '-v'])
+
+        self.assertTrue(args.tmux)
+        self.assertEqual(args.command, ['npm', '-v'])
+
+    def test_no_command(self):
+        """Test that no command yields an empty command list"""
+        args = parse_args(['--py'])
+
+        self.assertTrue(args.py)
+        self.assertEqual(args.command, [])
+
+
+class TestDaemonManager(unittest.TestCase):
+    """Test long-lived background containers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.runtime = Mock(spec=ContainerRuntime)
+        self.runtime.runtime = 'docker'
+        self.runtime.name = 'docker'
+        self.daemon_manager = DaemonManager(self.runtime)
+
+    def test_container_name_is_stable(self):
+        """Test that identical options map to the same container"""
+        name1 = DaemonManager.get_container_name('box-node-lts', ['-v', '/src:/root/src:rw'])
+        name2 = DaemonManager.get_container_name('box-node-lts', ['-v', '/src:/root/src:rw'])
+        name3 = DaemonManager.get_container_name('box-node-lts', ['-v', '/src:/root/src:ro'])
+
+        self.assertTrue(name1.startswith('box-daemon-'))
+        self.assertEqual(name1, name2)
+        self.assertNotEqual(name1, name3)
+
+    @patch('subprocess.run')
+    def test_rebuilt_image_gets_new_container(self, mock_run):
+        """Test that rebuilding a named image under the same name selects a fresh container"""
+        mock_run.side_effect = [
+            MagicMock(returncode=0, stdout='box-named-app:latest 1a2b3c4d5e6f\n', stderr=''),
+            MagicMock(returncode=0, stdout='box-named-app:latest 6f5e4d3c2b1a\n', stderr=''),
+        ]
+        container_args = ['-v', '/src:/root/src:rw']
+
+        # One run before the rebuild and one after, each reading the ID from its image listing
+        old_builder, new_builder = ImageBuilder(self.runtime), ImageBuilder(self.runtime)
+        self.assertTrue(old_builder.image_exists('box-named-app'))
+        self.assertTrue(new_builder.image_exists('box-named-app'))
+        old_id = old_builder.get_image_id('box-named-app')
+        new_id = new_builder.get_image_id('box-named-app')
+
+        self.assertEqual((old_id, new_id), ('1a2b3c4d5e6f', '6f5e4d3c2b1a'))
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertNotEqual(
+            DaemonManager.get_container_name('box-named-app', container_args, old_id),
+            DaemonManager.get_container_name('box-named-app', container_args, new_id)
+        )
+
+    @patch('subprocess.run')
+    def test_running_container_is_reused(self, mock_run):
+        """Test that a running container is not started again"""
+        mock_run.return_value = MagicMock(returncode=0, stdout='box-daemon-abc\n', stderr='')
+
+        self.assertTrue(self.daemon_manager.ensure_running('box-daemon-abc', 'box-node-lts', []))
+        mock_run.assert_called_once()
+
+    @patch('builtins.print')
+    @patch('subprocess.run')
+    def test_missing_container_is_started(self, mock_run, mock_print):
+        """Test that a missing container is started detached with the given options"""
+        ps_result = MagicMock(returncode=0, stdout='', stderr='')
+        run_result = MagicMock(returncode=0, stdout='id\n', stderr='')
+        mock_run.side_effect = [ps_result, run_result]
+
+        self.assertTrue(self.daemon_manager.ensure_running('box-daemon-abc', 'box-node-lts', ['-p', '3000:3000']))
+        self.assertEqual(
+            mock_run.call_args[0][0],
+            ['docker', 'run', '-d', '--rm', '--name', 'box-daemon-abc', '-p', '3000:3000',
+             '--entrypoint', 'tail', 'box-node-lts', '-f', '/dev/null']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
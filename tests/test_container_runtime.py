@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Tests for container runtime detection"""
+
+import unittest
+import json
+from unittest.mock import patch
+import sys
+import os
+import time
+from pathlib import Path
+
+# Add parent directory to path to import box module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from box.cli import ContainerRuntime
+from tests.test_config_manager import BaseTestCase
+
+
+class TestRuntimeCache(BaseTestCase):
+    """Test caching of the detected runtime path"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        super().setUp()
+        self.cache_file = self.config_dir / 'runtime.json'
+
+        # ContainerRuntime keeps its cache under the home directory
+        self.home_patcher = patch('box.cli.Path.home', return_value=Path(self.test_dir))
+        self.home_patcher.start()
+
+        # Pretend the daemon is always reachable
+        self.daemon_patcher = patch.object(ContainerRuntime, '_check_daemon_running', return_value=True)
+        self.mock_check = self.daemon_patcher.start()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.daemon_patcher.stop()
+        self.home_patcher.stop()
+
+    def test_detected_runtime_is_cached(self):
+        """Test that a detected runtime path is written to the cache file"""
+        with patch('box.cli.shutil.which', return_value=sys.executable):
+            runtime = ContainerRuntime()
+
+        self.assertEqual(runtime.runtime, sys.executable)
+        with open(self.cache_file, 'r') as f:
+            self.assertEqual(json.load(f)['path'], sys.executable)
+
+    def test_cached_runtime_skips_detection(self):
+        """Test that a valid cached path is used without searching PATH"""
+        self.config_dir.mkdir(parents=True)
+        with open(self.cache_file, 'w') as f:
+            json.dump({'path': sys.executable}, f)
+
+        with patch('box.cli.shutil.which') as mock_which:
+            runtime = ContainerRuntime()
+            mock_which.assert_not_called()
+
+        self.assertEqual(runtime.runtime, sys.executable)
+
+    def test_stale_cache_falls_back_to_detection(self):
+        """Test that a cached path that no longer exists triggers detection"""
+        self.config_dir.mkdir(parents=True)
+        with open(self.cache_file, 'w') as f:
+            json.dump({'path': os.path.join(self.test_dir, 'missing', 'docker')}, f)
+
+        with patch('box.cli.shutil.which', return_value=sys.executable) as mock_which:
+            runtime = ContainerRuntime()
+            mock_which.assert_called()
+
+        self.assertEqual(runtime.runtime, sys.executable)
+
+    def test_recent_daemon_check_is_reused(self):
+        """Test that a daemon seen running moments ago is not probed again"""
+        self.config_dir.mkdir(parents=True)
+        with open(self.cache_file, 'w') as f:
+            json.dump({'path': sys.executable, 'verified_at': time.time()}, f)
+
+        ContainerRuntime()
+
+        self.mock_check.assert_not_called()
+
+    def test_expired_daemon_check_is_repeated(self):
+        """Test that an old daemon check is repeated and its time refreshed"""
+        self.config_dir.mkdir(parents=True)
+        with open(self.cache_file, 'w') as f:
+            json.dump({'path': sys.executable, 'verified_at': time.time() - 60}, f)
+
+        ContainerRuntime()
+
+        self.mock_check.assert_called_once()
+        with open(self.cache_file, 'r') as f:
+            self.assertGreater(json.load(f)['verified_at'], time.time() - 5)
+
+    def test_unchanged_failed_check_does_not_rewrite_cache(self):
+        """Test that the cache file is left alone when nothing in it would change"""
+        self.config_dir.mkdir(parents=True)
+        with open(self.cache_file, 'w') as f:
+            json.dump({'path': sys.executable, 'verified_at': 0.0}, f)
+        self.mock_check.return_value = False
+
+        with patch.object(ContainerRuntime, '_save_cached_runtime') as mock_save, \
+             patch('builtins.print'), self.assertRaises(SystemExit):
+            ContainerRuntime()
+
+        mock_save.assert_not_called()
+
+    def test_failed_cache_write_removes_temporary_file(self):
+        """Test that a cache write that fails does not leave a temporary file behind"""
+        with patch('box.cli.shutil.which', return_value=sys.executable), \
+             patch('box.cli.os.replace', side_effect=OSError('disk full')):
+            ContainerRuntime()
+
+        self.assertEqual(os.listdir(self.config_dir), [])
+
+    def test_runtime_name(self):
+        """Test that the runtime name strips the binary's directory"""
+        with patch('box.cli.shutil.which', return_value='/usr/local/bin/podman'), \
+             patch('box.cli.os.access', return_value=False):
+            runtime = ContainerRuntime()
+
+        self.assertEqual(runtime.name, 'podman')
+
+    def test_exec_missing_runtime_exits(self):
+        """Test that exec reports a runtime that has disappeared instead of raising"""
+        with patch('box.cli.shutil.which', return_value=sys.executable):
+            runtime = ContainerRuntime()
+
+        with patch('box.cli.os.execvp', side_effect=FileNotFoundError), \
+             patch('builtins.print'):
+            with self.assertRaises(SystemExit) as cm:
+                runtime.exec_command(['run', '--rm', 'alpine'])
+
+        self.assertEqual(cm.exception.code, 1)
+
+    def test_exec_os_error_exits(self):
+        """Test that exec reports other OS errors as an error line instead of a traceback"""
+        with patch('box.cli.shutil.which', return_value=sys.executable):
+            runtime = ContainerRuntime()
+
+        with patch('box.cli.os.execvp', side_effect=PermissionError(13, 'Permission denied')), \
+             patch('builtins.print') as mock_print:
+            with self.assertRaises(SystemExit) as cm:
+                runtime.exec_command(['run', '--rm', 'alpine'])
+
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(mock_print.call_args[0][0], 'Error: [Errno 13] Permission denied')
+
+
+if __name__ == '__main__':
+    unittest.main()
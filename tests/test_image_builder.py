@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Tests for ImageBuilder environment detection and image handling"""
+
+import unittest
+import io
+import tempfile
+import shutil
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, MagicMock, patch
+from box.cli import ImageBuilder, ContainerRuntime
+
+
+class TestContainerTypeDetection(unittest.TestCase):
+    """Test auto-detection of the container type from command and project files"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.runtime = Mock(spec=ContainerRuntime)
+        self.runtime.runtime = 'docker'
+        self.image_builder = ImageBuilder(self.runtime)
+
+        # Run each test from an empty project directory
+        self.original_cwd = os.getcwd()
+        self.project_dir = tempfile.mkdtemp()
+        os.chdir(self.project_dir)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.project_dir)
+
+    def touch(self, name):
+        """Create an empty file in the project directory"""
+        open(os.path.join(self.project_dir, name), 'w').close()
+
+    def test_command_detection(self):
+        """Test that known commands select their environment"""
+        self.assertEqual(self.image_builder.detect_container_type_from_command(['npm', 'install']), 'node')
+        self.assertEqual(self.image_builder.detect_container_type_from_command(['pytest']), 'python')
+        self.assertEqual(self.image_builder.detect_container_type_from_command(['echo', 'hi']), 'alpine')
+        self.assertEqual(self.image_builder.detect_container_type_from_command([]), 'alpine')
+
+    def test_shell_in_node_project(self):
+        """Test that a shell in a Node.js project selects the Node.js environment"""
+        self.touch('yarn.lock')
+        self.assertEqual(self.image_builder.detect_container_type_from_command(['bash']), 'node')
+
+    def test_shell_in_python_project(self):
+        """Test that a shell in a Python project selects the Python environment"""
+        self.touch('pyproject.toml')
+        self.assertEqual(self.image_builder.detect_container_type_from_command(['sh']), 'python')
+
+    def test_shell_without_project_files(self):
+        """Test that a shell without project indicators falls back to Alpine"""
+        self.touch('README.md')
+        self.assertEqual(self.image_builder.detect_container_type_from_command(['zsh']), 'alpine')
+
+
+class TestImageCache(unittest.TestCase):
+    """Test answering image existence checks from a single image listing"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.runtime = Mock(spec=ContainerRuntime)
+        self.runtime.runtime = 'docker'
+        self.image_builder = ImageBuilder(self.runtime)
+
+        # Home directory for the build context of tests that build images
+        self.home_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.home_dir, ignore_errors=True)
+
+    @patch('subprocess.run')
+    def test_image_exists_lists_images_once(self, mock_run):
+        """Test that repeated existence checks share one image listing"""
+        mock_run.return_value = MagicMock(returncode=0, stdout='box-node-lts:latest\nnode:lts\n', stderr='')
+
+        self.assertTrue(self.image_builder.image_exists('box-node-lts'))
+        self.assertTrue(self.image_builder.image_exists('node:lts'))
+        self.assertFalse(self.image_builder.image_exists('python:latest'))
+
+        mock_run.assert_called_once_with(
+            ['docker', 'images', '--format', '{{.Repository}}:{{.Tag}} {{.ID}}'],
+            capture_output=True,
+            text=True
+        )
+
+    @patch('subprocess.run')
+    def test_image_id_from_listing_or_inspect(self, mock_run):
+        """Test that image IDs come from the cached listing, inspecting only unlisted images"""
+        mock_run.side_effect = [
+            MagicMock(returncode=0, stdout='box-node-lts:latest 1a2b3c4d5e6f\n', stderr=''),
+            MagicMock(returncode=0, stdout='sha256:abcdef\n', stderr=''),
+        ]
+
+        self.assertTrue(self.image_builder.image_exists('box-node-lts'))
+        self.assertEqual(self.image_builder.get_image_id('box-node-lts'), '1a2b3c4d5e6f')
+        self.assertEqual(mock_run.call_count, 1)
+
+        self.image_builder._remember_image('box-python-latest')
+        self.assertEqual(self.image_builder.get_image_id('box-python-latest'), 'sha256:abcdef')
+        self.assertEqual(
+            mock_run.call_args[0][0],
+            ['docker', 'image', 'inspect', '--format', '{{.Id}}', 'box-python-latest']
+        )
+
+    @patch('subprocess.run')
+    def test_image_exists_with_podman_references(self, mock_run):
+        """Test that Podman's qualified references match short image names"""
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout='localhost/box-alpine-latest:latest\ndocker.io/library/python:3.11\n',
+            stderr=''
+        )
+
+        self.assertTrue(self.image_builder.image_exists('box-alpine-latest'))
+        self.assertTrue(self.image_builder.image_exists('python:3.11'))
+
+    @patch('subprocess.run')
+    def test_image_exists_falls_back_to_inspect(self, mock_run):
+        """Test that a failed listing falls back to inspecting the image"""
+        list_result = MagicMock(returncode=1, stdout='', stderr='error')
+        inspect_result = MagicMock(returncode=0, stdout='', stderr='')
+        mock_run.side_effect = [list_result, inspect_result]
+
+        self.assertTrue(self.image_builder.image_exists('box-node-lts'))
+        self.assertEqual(mock_run.call_args[0][0], ['docker', 'image', 'inspect', 'box-node-lts'])
+
+    @patch('builtins.print')
+    @patch('subprocess.run')
+    def test_built_image_is_added_to_cache(self, mock_run, mock_print):
+        """Test that a successful build is visible without listing images again"""
+        mock_run.return_value = MagicMock(returncode=0, stdout='node:lts\n', stderr='')
+        build_process = MagicMock(stderr=io.BytesIO(b''))
+        build_process.wait.return_value = 0
+
+        self.assertFalse(self.image_builder.image_exists('box-node-lts'))
+        with patch('box.cli.Path.home', return_value=Path(self.home_dir)), \
+             patch('subprocess.Popen', return_value=build_process):
+            self.assertTrue(self.image_builder.build_image('node:lts', 'box-node-lts'))
+
+        self.assertTrue(self.image_builder.image_exists('box-node-lts'))
+        mock_run.assert_called_once()
+
+    @patch('builtins.print')
+    def test_failed_build_reports_stderr_tail(self, mock_print):
+        """Test that only the end of a long build log is kept for the error message"""
+        log = b''.join(b'step %d\n' % i for i in range(1000)) + b'error: no space left on device\n'
+        build_process = MagicMock(stderr=io.BytesIO(log))
+        build_process.wait.return_value = 1
+
+        with patch('box.cli.Path.home', return_value=Path(self.home_dir)), \
+             patch('subprocess.Popen', return_value=build_process):
+            self.assertFalse(self.image_builder.build_image('node:lts', 'box-node-lts'))
+
+        message = mock_print.call_args[0][0]
+        self.assertTrue(message.startswith('✗ Failed to build image: '))
+        self.assertIn('error: no space left on device', message)
+        self.assertNotIn('step 0\n', message)
+
+
+class TestDockerfileTag(unittest.TestCase):
+    """Test tagging generated images with their Dockerfile hash"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.runtime = Mock(spec=ContainerRuntime)
+        self.runtime.runtime = 'docker'
+        self.image_builder = ImageBuilder(self.runtime)
+
+    def test_tag_follows_dockerfile_content(self):
+        """Test that the tag changes only when the Dockerfile changes"""
+        tag = self.image_builder.get_dockerfile_tag('node:lts')
+
+        self.assertEqual(tag, self.image_builder.get_dockerfile_tag('node:lts'))
+        self.assertNotEqual(tag, self.image_builder.get_dockerfile_tag('node:lts', include_tmux=True))
+        self.assertNotEqual(tag, self.image_builder.get_dockerfile_tag('node:20'))
+
+    @patch('subprocess.run')
+    def test_existing_tagged_image_is_reused(self, mock_run):
+        """Test that an image built from the same Dockerfile is reused without building"""
+        tag = self.image_builder.get_dockerfile_tag('node:lts')
+        mock_run.return_value = MagicMock(returncode=0, stdout=f'box-node-lts:{tag}\n', stderr='')
+        args = SimpleNamespace(node=True, py=False, image_version=None, tmux=False, command=[], name=None)
+
+        with patch.object(self.image_builder, 'build_image') as mock_build:
+            self.assertEqual(self.image_builder.get_or_build_image(args), f'box-node-lts:{tag}')
+            mock_build.assert_not_called()
+
+    @patch('subprocess.run')
+    def test_stale_image_is_rebuilt(self, mock_run):
+        """Test that an image built from an older Dockerfile is not reused"""
+        mock_run.return_value = MagicMock(returncode=0, stdout='box-node-lts:latest\nnode:lts\n', stderr='')
+        args = SimpleNamespace(node=True, py=False, image_version=None, tmux=False, command=[], name=None)
+
+        with patch.object(self.image_builder, 'build_image', return_value=True) as mock_build:
+            image = self.image_builder.get_or_build_image(args)
+
+        tag = self.image_builder.get_dockerfile_tag('node:lts')
+        self.assertEqual(image, f'box-node-lts:{tag}')
+        mock_build.assert_called_once_with('node:lts', f'box-node-lts:{tag}', False)
+        # The base image is left for the build to pull
+        mock_run.assert_called_once()
+
+
+class TestCleanBoxImages(unittest.TestCase):
+    """Test removal of box-built images"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.runtime = Mock(spec=ContainerRuntime)
+        self.runtime.runtime = 'docker'
+        self.image_builder = ImageBuilder(self.runtime)
+
+    @patch('builtins.print')
+    @patch('subprocess.run')
+    def test_clean_removes_images_in_one_call(self, mock_run, mock_print):
+        """Test that all box images are removed with a single rmi call"""
+        list_result = MagicMock(returncode=0, stdout='box-node-lts:latest\nnode:lts\nbox-alpine-latest:latest\n', stderr='')
+        remove_result = MagicMock(returncode=0, stdout='', stderr='')
+        mock_run.side_effect = [list_result, remove_result]
+
+        self.image_builder.clean_box_images()
+
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertEqual(
+            mock_run.call_args[0][0],
+            ['docker', 'rmi', 'box-alpine-latest:latest', 'box-node-lts:latest']
+        )
+        mock_print.assert_any_call("Successfully removed 2/2 images")
+
+    @patch('builtins.print')
+    @patch('subprocess.run')
+    def test_clean_keeps_namespaced_images(self, mock_run, mock_print):
+        """Test that images from other box-* repositories survive --clean"""
+        list_result = MagicMock(
+            returncode=0,
+            stdout='box-node-lts:latest\nbox-org/tool:1\nlocalhost/box-team/app:latest\n',
+            stderr=''
+        )
+        remove_result = MagicMock(returncode=0, stdout='', stderr='')
+        mock_run.side_effect = [list_result, remove_result]
+
+        self.image_builder.clean_box_images()
+
+        self.assertEqual(mock_run.call_args[0][0], ['docker', 'rmi', 'box-node-lts:latest'])
+        mock_print.assert_any_call("Successfully removed 1/1 images")
+
+    @patch('builtins.print')
+    @patch('subprocess.run')
+    def test_clean_retries_failed_images_individually(self, mock_run, mock_print):
+        """Test that images left over by a failed batch are retried one at a time"""
+        list_result = MagicMock(returncode=0, stdout='box-node-lts:latest\nnode:lts\nbox-alpine-latest:latest\n', stderr='')
+        remove_result = MagicMock(
+            returncode=1,
+            stdout='Untagged: box-alpine-latest:latest\nDeleted: sha256:abc\n',
+            stderr='Error response from daemon: conflict: unable to remove box-node-lts:latest'
+        )
+        retry_result = MagicMock(
+            returncode=1,
+            stdout='',
+            stderr='Error response from daemon: conflict: unable to remove box-node-lts:latest'
+        )
+        mock_run.side_effect = [list_result, remove_result, retry_result]
+
+        self.image_builder.clean_box_images()
+
+        self.assertEqual(mock_run.call_count, 3)
+        self.assertEqual(mock_run.call_args[0][0], ['docker', 'rmi', 'box-node-lts:latest'])
+        mock_print.assert_any_call("✓ Removed box-alpine-latest:latest")
+        mock_print.assert_any_call("✗ Failed to remove box-node-lts:latest")
+        mock_print.assert_any_call("  Error: Error response from daemon: conflict: unable to remove box-node-lts:latest")
+        mock_print.assert_any_call("Successfully removed 1/2 images")
+        self.assertIsNone(self.image_builder._image_ids)
+
+    @patch('builtins.print')
+    @patch('subprocess.run')
+    def test_clean_batches_large_image_sets(self, mock_run, mock_print):
+        """Test that many box images are removed in bounded batches"""
+        names = [f'box-test-{i:03d}:latest' for i in range(100)]
+        list_result = MagicMock(returncode=0, stdout='\n'.join(names) + '\n', stderr='')
+        remove_result = MagicMock(returncode=0, stdout='', stderr='')
+        mock_run.side_effect = [list_result, remove_result, remove_result]
+
+        self.image_builder.clean_box_images()
+
+        self.assertEqual(mock_run.call_count, 3)
+        self.assertEqual(mock_run.call_args_list[1][0][0], ['docker', 'rmi'] + names[:64])
+        self.assertEqual(mock_run.call_args_list[2][0][0], ['docker', 'rmi'] + names[64:])
+        mock_print.assert_any_call("Successfully removed 100/100 images")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -21,9 +21,8 @@ class TestMountMerging(BaseTestCase):
         super().setUp()
         
         # Mock container runtime detection
-        self.runtime_patcher = patch('box.cli.shutil.which')
-        self.mock_which = self.runtime_patcher.start()
-        self.mock_which.return_value = '/usr/bin/docker'
+        self.runtime_patcher = patch('box.cli.shutil.which', new=lambda name: '/usr/bin/docker')
+        self.runtime_patcher.start()
     
     def tearDown(self):
         """Clean up test fixtures"""
@@ -32,7 +31,7 @@ class TestMountMerging(BaseTestCase):
     
     def test_mount_merging_with_existing_image(self):
         """Test that new mounts are merged with saved configuration when using -i"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Save a configuration with existing mounts
         args_save = self.create_mock_args(
@@ -76,7 +75,7 @@ class TestMountMerging(BaseTestCase):
     
     def test_mount_merging_no_new_mounts(self):
         """Test that saved mounts are used when no new mounts provided"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Save a configuration with existing mounts
         args_save = self.create_mock_args(
@@ -112,7 +111,7 @@ class TestMountMerging(BaseTestCase):
     
     def test_mount_merging_no_saved_mounts(self):
         """Test that new mounts work when no saved mounts exist"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Save a configuration without mounts
         args_save = self.create_mock_args(
@@ -150,7 +149,7 @@ class TestMountMerging(BaseTestCase):
     @patch('box.cli.parse_args')
     def test_end_to_end_mount_merging(self, mock_parse_args):
         """End-to-end test simulating actual CLI usage with mount merging"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Step 1: Simulate creating named image with initial mounts
         # Command: box -n test-env --node -rw ./saved npm start
@@ -2,6 +2,7 @@
 """Unit tests for named image functionality"""
 
 import unittest
+from collections import namedtuple
 import json
 import tempfile
 import shutil
@@ -18,217 +19,214 @@ from box.cli import ConfigManager, ImageBuilder, ContainerRuntime
 from tests.test_config_manager import BaseTestCase
 
 
+ImageNameCase = namedtuple('ImageNameCase', 'base_image tmux custom_name expected')
+
+# Saved configurations for the named images built in these tests
+NODE_APP_CONFIG = {
+    'command': ['npm', 'start'],
+    'node': True,
+    'py': False,
+    'image_version': '18',
+    'tmux': False,
+    'port': ['3000'],
+    'read_only': [],
+    'read_write': ['.']
+}
+
+PYTHON_APP_CONFIG = {
+    'command': ['python', 'app.py'],
+    'node': False,
+    'py': True,
+    'image_version': '3.9',
+    'tmux': True,
+    'port': ['8000'],
+    'read_only': [],
+    'read_write': ['/app']
+}
+
+NODE_SERVER_CONFIG = {
+    'command': ['node', 'server.js'],
+    'node': True,
+    'py': False,
+    'image_version': None,
+    'tmux': False,
+    'port': [],
+    'read_only': [],
+    'read_write': []
+}
+
+NODE_TMUX_CONFIG = {
+    'command': ['npm', 'test'],
+    'node': True,
+    'py': False,
+    'image_version': '16',
+    'tmux': True,
+    'port': ['3000', '8080:8080'],
+    'read_only': ['/data'],
+    'read_write': ['/code']
+}
+
+
 class TestNamedImages(BaseTestCase):
     """Test cases for named image functionality"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test in the class"""
+        super().setUpClass()
+        
+        # Mock container runtime
+        cls.runtime_patcher = patch('box.cli.shutil.which', return_value='/usr/bin/docker')
+        cls.mock_which = cls.runtime_patcher.start()
+        
+        # Mock container runtime commands
+        cls.run_patcher = patch('box.cli.subprocess.run')
+        cls.mock_run = cls.run_patcher.start()
+        
+        # Build the runtime, config manager and image builder once, against the
+        # test home directory and without needing a running container daemon
+        with patch('box.cli.Path.home', return_value=Path(cls.test_dir)), \
+             patch.object(ContainerRuntime, '_check_daemon_running', return_value=True):
+            cls.runtime = ContainerRuntime()
+            cls.config_manager = ConfigManager(home_dir=cls.test_dir)
+        cls.image_builder = ImageBuilder(cls.runtime, cls.config_manager)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared fixtures"""
+        cls.run_patcher.stop()
+        cls.runtime_patcher.stop()
+        super().tearDownClass()
+    
     def setUp(self):
         """Set up test fixtures"""
         super().setUp()
+        self.mock_run.reset_mock(return_value=True, side_effect=True)
         
-        # Mock container runtime
-        self.runtime_patcher = patch('box.cli.shutil.which')
-        self.mock_which = self.runtime_patcher.start()
-        self.mock_which.return_value = '/usr/bin/docker'
+        # Forget the config and image listing cached by earlier tests
+        self.config_manager._config = None
+        self.image_builder._image_ids = None
     
-    def tearDown(self):
-        """Clean up test fixtures"""
-        self.runtime_patcher.stop()
-        super().tearDown()
+    def _stub_image_exists(self, value=True):
+        """Patch the image builder to report whether images exist without asking the runtime"""
+        return patch.object(self.image_builder, 'image_exists', return_value=value)
     
-    def test_get_box_image_name_with_custom_name(self):
-        """Test generating box image name with custom name"""
-        runtime = ContainerRuntime()
-        image_builder = ImageBuilder(runtime)
-        
-        # Test with custom name
-        name = image_builder.get_box_image_name('node:18', False, 'my-app')
-        self.assertEqual(name, 'box-named-my-app')
-        
-        # Test with custom name and tmux
-        name_tmux = image_builder.get_box_image_name('node:18', True, 'my-app')
-        self.assertEqual(name_tmux, 'box-named-my-app-tmux')
-        
-        # Test without custom name (original behavior)
-        name_default = image_builder.get_box_image_name('node:18', False, None)
-        self.assertEqual(name_default, 'box-node-18')
+    def test_image_name_matrix(self):
+        """Test generating box image names with and without a custom name"""
+        cases = [
+            ImageNameCase('node:18', False, 'my-app', 'box-named-my-app'),
+            ImageNameCase('node:18', True, 'my-app', 'box-named-my-app-tmux'),
+            # Without custom name (original behavior)
+            ImageNameCase('node:18', False, None, 'box-node-18'),
+        ]
+        
+        for case in cases:
+            with self.subTest(**case._asdict()):
+                name = self.image_builder.get_box_image_name(case.base_image, case.tmux, case.custom_name)
+                self.assertEqual(name, case.expected)
     
-    @patch('subprocess.run')
-    def test_get_or_build_named_image(self, mock_run):
+    def test_get_or_build_named_image(self):
         """Test building or retrieving a named image from configuration"""
-        runtime = ContainerRuntime()
-        config_manager = ConfigManager()
-        image_builder = ImageBuilder(runtime, config_manager)
-        
         # Mock image doesn't exist
-        mock_run.return_value = MagicMock(returncode=1, stdout='', stderr='')
-        
-        config = {
-            'command': ['npm', 'start'],
-            'node': True,
-            'py': False,
-            'image_version': '18',
-            'tmux': False,
-            'port': ['3000'],
-            'read_only': [],
-            'read_write': ['.']
-        }
+        self.mock_run.return_value = MagicMock(returncode=1, stdout='', stderr='')
+        
+        config = NODE_APP_CONFIG
         
         # Mock successful pull and build
-        with patch.object(image_builder, 'build_named_image_with_command', return_value='box-named-test-app'):
-            result = image_builder.get_or_build_named_image('test-app', config)
+        with patch.object(self.image_builder, 'build_named_image_with_command', return_value='box-named-test-app'):
+            result = self.image_builder.get_or_build_named_image('test-app', config)
         
         self.assertEqual(result, 'box-named-test-app')
     
-    @patch('subprocess.run')
-    def test_get_or_build_named_image_exists(self, mock_run):
+    def test_get_or_build_named_image_exists(self):
         """Test retrieving existing named image"""
-        runtime = ContainerRuntime()
-        config_manager = ConfigManager()
-        image_builder = ImageBuilder(runtime, config_manager)
-        
         # Mock image exists
-        mock_run.return_value = MagicMock(returncode=0, stdout='', stderr='')
+        self.mock_run.return_value = MagicMock(returncode=0, stdout='box-named-python-app-tmux:latest\n', stderr='')
         
-        config = {
-            'command': ['python', 'app.py'],
-            'node': False,
-            'py': True,
-            'image_version': '3.9',
-            'tmux': True,
-            'port': ['8000'],
-            'read_only': [],
-            'read_write': ['/app']
-        }
+        config = PYTHON_APP_CONFIG
         
-        result = image_builder.get_or_build_named_image('python-app', config)
+        result = self.image_builder.get_or_build_named_image('python-app', config)
         
         self.assertEqual(result, 'box-named-python-app-tmux')
         
         # Verify no build was attempted (image already exists)
-        with patch.object(image_builder, 'build_image') as mock_build:
-            result = image_builder.get_or_build_named_image('python-app', config)
+        with patch.object(self.image_builder, 'build_image') as mock_build:
+            result = self.image_builder.get_or_build_named_image('python-app', config)
             mock_build.assert_not_called()
     
-    @patch('subprocess.run')
-    def test_get_or_build_named_image_build_fails(self, mock_run):
+    def test_get_or_build_named_image_build_fails(self):
         """Test handling of build failure for named image"""
-        runtime = ContainerRuntime()
-        config_manager = ConfigManager()
-        image_builder = ImageBuilder(runtime, config_manager)
-        
         # Mock image doesn't exist
-        mock_run.return_value = MagicMock(returncode=1, stdout='', stderr='')
-        
-        config = {
-            'command': ['node', 'server.js'],
-            'node': True,
-            'py': False,
-            'image_version': None,
-            'tmux': False,
-            'port': [],
-            'read_only': [],
-            'read_write': []
-        }
+        self.mock_run.return_value = MagicMock(returncode=1, stdout='', stderr='')
+        
+        config = NODE_SERVER_CONFIG
         
         # Mock build failure
-        with patch.object(image_builder, 'build_image', return_value=False):
-            result = image_builder.get_or_build_named_image('failing-app', config)
+        with patch.object(self.image_builder, 'build_image', return_value=False):
+            result = self.image_builder.get_or_build_named_image('failing-app', config)
         
         self.assertIsNone(result)
     
     def test_args_reconstruction_from_config(self):
         """Test that Args class correctly reconstructs from config"""
-        runtime = ContainerRuntime()
-        config_manager = ConfigManager()
-        image_builder = ImageBuilder(runtime, config_manager)
-        
-        config = {
-            'command': ['npm', 'test'],
-            'node': True,
-            'py': False,
-            'image_version': '16',
-            'tmux': True,
-            'port': ['3000', '8080:8080'],
-            'read_only': ['/data'],
-            'read_write': ['/code']
-        }
+        config = NODE_TMUX_CONFIG
         
         # Access the Args class used in get_or_build_named_image
         # We'll test the reconstruction logic indirectly
-        with patch.object(image_builder, 'get_base_image') as mock_get_base:
-            with patch.object(image_builder, 'image_exists', return_value=True):
-                image_builder.get_or_build_named_image('test', config)
-                
-                # Check that get_base_image was called with properly reconstructed args
-                args = mock_get_base.call_args[0][0]
-                self.assertTrue(args.node)
-                self.assertFalse(args.py)
-                self.assertEqual(args.image_version, '16')
-                self.assertTrue(args.tmux)
-                self.assertEqual(args.command, ['npm', 'test'])
-                self.assertEqual(args.name, 'test')
-    
-    def test_get_or_build_image_with_name(self):
-        """Test get_or_build_image with name argument"""
-        runtime = ContainerRuntime()
-        config_manager = ConfigManager()
-        image_builder = ImageBuilder(runtime, config_manager)
-        
-        # Create mock args with name
-        args = self.create_mock_args(
-            node=True,
-            command=['npm', 'start']
-        )
-        args.name = 'custom-app'
-        
-        with patch.object(image_builder, 'image_exists', return_value=True):
-            result = image_builder.get_or_build_image(args)
-            expected = 'box-named-custom-app'
-            self.assertEqual(result, expected)
+        with patch.object(self.image_builder, 'get_base_image') as mock_get_base, self._stub_image_exists():
+            self.image_builder.get_or_build_named_image('test', config)
+        
+        # Check that get_base_image was called with properly reconstructed args
+        args = mock_get_base.call_args[0][0]
+        self.assertTrue(args.node)
+        self.assertFalse(args.py)
+        self.assertEqual(args.image_version, '16')
+        self.assertTrue(args.tmux)
+        self.assertEqual(args.command, ['npm', 'test'])
+        self.assertEqual(args.name, 'test')
     
-    def test_get_or_build_image_without_name(self):
-        """Test get_or_build_image without name argument"""
-        runtime = ContainerRuntime()
-        config_manager = ConfigManager()
-        image_builder = ImageBuilder(runtime, config_manager)
-        
-        # Create mock args without name attribute
-        args = self.create_mock_args(
-            py=True,
-            image_version='3.10',
-            tmux=True,
-            command=['python']
-        )
-        
-        # Remove name attribute
-        del args.name
+    def test_get_or_build_image_naming(self):
+        """Test get_or_build_image with and without a name argument"""
+        tag = self.image_builder.get_dockerfile_tag('python:3.10', include_tmux=True)
+        cases = [
+            ('with name', {'node': True, 'command': ['npm', 'start'], 'name': 'custom-app'},
+             'box-named-custom-app'),
+            # Args without a name attribute at all
+            ('without name', {'py': True, 'image_version': '3.10', 'tmux': True, 'command': ['python']},
+             f'box-python-3.10-tmux:{tag}'),
+        ]
         
-        with patch.object(image_builder, 'image_exists', return_value=True):
-            result = image_builder.get_or_build_image(args)
-            expected = 'box-python-3.10-tmux'
-            self.assertEqual(result, expected)
+        with self._stub_image_exists():
+            for label, arg_values, expected in cases:
+                with self.subTest(label):
+                    args = self.create_mock_args(**arg_values)
+                    if 'name' not in arg_values:
+                        del args.name
+                    
+                    self.assertEqual(self.image_builder.get_or_build_image(args), expected)
 
 
 class TestIntegrationScenarios(BaseTestCase):
     """Integration tests for named image scenarios"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        super().setUp()
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test in the class"""
+        super().setUpClass()
         
         # Mock container runtime detection
-        self.runtime_patcher = patch('box.cli.shutil.which')
-        self.mock_which = self.runtime_patcher.start()
-        self.mock_which.return_value = '/usr/bin/docker'
+        cls.runtime_patcher = patch('box.cli.shutil.which', return_value='/usr/bin/docker')
+        cls.mock_which = cls.runtime_patcher.start()
     
-    def tearDown(self):
-        """Clean up test fixtures"""
-        self.runtime_patcher.stop()
-        super().tearDown()
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up shared fixtures"""
+        cls.runtime_patcher.stop()
+        super().tearDownClass()
     
     def test_save_and_load_cycle(self):
         """Test complete save and load cycle for named image"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Save configuration
         args_save = self.create_mock_args(
@@ -258,7 +256,7 @@ class TestIntegrationScenarios(BaseTestCase):
     
     def test_multiple_named_images(self):
         """Test managing multiple named images"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Create multiple configurations
         configs = [
@@ -297,7 +295,7 @@ class TestIntegrationScenarios(BaseTestCase):
     def test_config_persistence(self):
         """Test that configurations persist across ConfigManager instances"""
         # Create and save config with first instance
-        config_manager1 = ConfigManager()
+        config_manager1 = ConfigManager(home_dir=self.test_dir)
         
         args = self.create_mock_args(
             command=['node', 'index.js'],
@@ -310,7 +308,7 @@ class TestIntegrationScenarios(BaseTestCase):
         config_manager1.save_image_config('persistent-app', args)
         
         # Create new instance and verify config is loaded
-        config_manager2 = ConfigManager()
+        config_manager2 = ConfigManager(home_dir=self.test_dir)
         
         loaded = config_manager2.get_image_config('persistent-app')
         self.assertIsNotNone(loaded)
@@ -322,7 +320,7 @@ class TestIntegrationScenarios(BaseTestCase):
     
     def test_error_handling_for_missing_image(self):
         """Test error handling when named image doesn't exist"""
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(home_dir=self.test_dir)
         
         # Try to get non-existent config
         result = config_manager.get_image_config('non-existent')
@@ -7,21 +7,32 @@ import subprocess
 from box.cli import NetworkManager, ContainerRuntime, parse_args
 
 
+# Proxy environment expected for --http-proxy http://proxy.example.com:3128
+EXPECTED_PROXY_ENV = {
+    'HTTP_PROXY': 'http://proxy.example.com:3128',
+    'HTTPS_PROXY': 'http://proxy.example.com:3128',
+    'http_proxy': 'http://proxy.example.com:3128',
+    'https_proxy': 'http://proxy.example.com:3128'
+}
+
+
 class TestNetworkManager(unittest.TestCase):
     """Test NetworkManager functionality"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the runtime mock shared by every test; NetworkManager only reads it"""
+        cls.runtime = Mock(spec=ContainerRuntime)
+        cls.runtime.runtime = 'docker'
+
     def setUp(self):
         """Set up test fixtures"""
-        self.runtime = Mock(spec=ContainerRuntime)
-        self.runtime.runtime = 'docker'
-        self.network_manager = NetworkManager(self.runtime)
+        self.mock_run = Mock()
+        self.network_manager = NetworkManager(self.runtime, runner=self.mock_run)
 
     def test_no_network_configuration(self):
         """Test --no-network flag generates correct arguments"""
-        args = Mock()
-        args.no_network = True
-        args.internal_network = False
-        args.http_proxy = None
+        args = Mock(no_network=True, internal_network=False, http_proxy=None)
 
         network_args, env_vars = self.network_manager.get_network_args(args)
 
@@ -30,10 +41,7 @@ class TestNetworkManager(unittest.TestCase):
 
     def test_internal_network_configuration(self):
         """Test --internal-network flag generates correct arguments"""
-        args = Mock()
-        args.no_network = False
-        args.internal_network = True
-        args.http_proxy = None
+        args = Mock(no_network=False, internal_network=True, http_proxy=None)
 
         with patch.object(self.network_manager, '_ensure_internal_network') as mock_ensure:
             network_args, env_vars = self.network_manager.get_network_args(args)
@@ -44,28 +52,17 @@ class TestNetworkManager(unittest.TestCase):
 
     def test_http_proxy_configuration(self):
         """Test --http-proxy flag generates correct environment variables"""
-        args = Mock()
-        args.no_network = False
-        args.internal_network = False
-        args.http_proxy = 'http://proxy.example.com:3128'
+        args = Mock(no_network=False, internal_network=False, http_proxy='http://proxy.example.com:3128')
 
         network_args, env_vars = self.network_manager.get_network_args(args)
 
         self.assertEqual(network_args, [])
-        expected_env = {
-            'HTTP_PROXY': 'http://proxy.example.com:3128',
-            'HTTPS_PROXY': 'http://proxy.example.com:3128',
-            'http_proxy': 'http://proxy.example.com:3128',
-            'https_proxy': 'http://proxy.example.com:3128'
-        }
-        self.assertEqual(env_vars, expected_env)
+        self.assertEqual(env_vars, EXPECTED_PROXY_ENV)
 
     def test_no_network_takes_precedence(self):
         """Test that --no-network takes precedence over --internal-network"""
-        args = Mock()
-        args.no_network = True
-        args.internal_network = True  # This should be ignored
-        args.http_proxy = None
+        # internal_network should be ignored
+        args = Mock(no_network=True, internal_network=True, http_proxy=None)
 
         network_args, env_vars = self.network_manager.get_network_args(args)
 
@@ -84,55 +81,47 @@ class TestNetworkManager(unittest.TestCase):
         expected = ['-e', 'HTTP_PROXY=http://proxy:3128', '-e', 'HTTPS_PROXY=http://proxy:3128']
         self.assertEqual(env_args, expected)
 
-    @patch('subprocess.run')
-    def test_ensure_internal_network_exists(self, mock_run):
-        """Test internal network creation when network exists"""
-        # Mock network inspect success (network exists)
-        mock_run.return_value.returncode = 0
-
-        self.network_manager._ensure_internal_network()
-
-        # Should only check, not create
-        mock_run.assert_called_once_with(
-            ['docker', 'network', 'inspect', 'box-internal'],
-            capture_output=True
+    @patch('builtins.print')
+    def test_ensure_internal_network(self, mock_print):
+        """Test finding, creating and failing to create the internal network"""
+        list_call = call(
+            ['docker', 'network', 'ls', '--filter', 'name=^box-internal$', '--format', '{{.Name}}'],
+            capture_output=True,
+            text=True
         )
+        create_call = call(['docker', 'network', 'create', '--internal', 'box-internal'], capture_output=True)
+        failed_create = Mock(returncode=1)
+        failed_create.stderr.decode.return_value = "Network creation failed"
+
+        # (label, subprocess results, expected calls, expected warning)
+        scenarios = [
+            # Network exists: only check, do not create
+            ('exists', [Mock(returncode=0, stdout='box-internal\n')], [list_call], None),
+            # Empty listing: check, then create
+            ('created', [Mock(returncode=0, stdout=''), Mock(returncode=0)], [list_call, create_call], None),
+            ('creation fails', [Mock(returncode=0, stdout=''), failed_create], [list_call, create_call],
+             "Warning: Failed to create internal network: Network creation failed"),
+        ]
 
-    @patch('subprocess.run')
-    def test_ensure_internal_network_create(self, mock_run):
-        """Test internal network creation when network doesn't exist"""
-        # Mock network inspect failure (network doesn't exist), then creation success
-        inspect_result = Mock()
-        inspect_result.returncode = 1
-        create_result = Mock()
-        create_result.returncode = 0
-        mock_run.side_effect = [inspect_result, create_result]
+        for label, results, expected_calls, warning in scenarios:
+            with self.subTest(label):
+                mock_print.reset_mock()
+                mock_run = Mock(side_effect=results)
 
-        self.network_manager._ensure_internal_network()
+                NetworkManager(self.runtime, runner=mock_run)._ensure_internal_network()
 
-        # Should check then create
-        expected_calls = [
-            call(['docker', 'network', 'inspect', 'box-internal'], capture_output=True),
-            call(['docker', 'network', 'create', '--internal', 'box-internal'], capture_output=True)
-        ]
-        mock_run.assert_has_calls(expected_calls)
+                self.assertEqual(mock_run.call_args_list, expected_calls)
+                if warning:
+                    mock_print.assert_any_call(warning)
 
-    @patch('subprocess.run')
-    @patch('builtins.print')
-    def test_ensure_internal_network_create_failure(self, mock_print, mock_run):
-        """Test handling of internal network creation failure"""
-        # Mock network inspect failure, then creation failure
-        inspect_result = Mock()
-        inspect_result.returncode = 1
-        create_result = Mock()
-        create_result.returncode = 1
-        create_result.stderr.decode.return_value = "Network creation failed"
-        mock_run.side_effect = [inspect_result, create_result]
+    def test_ensure_internal_network_checks_once(self):
+        """Test that the network is only checked once per manager"""
+        self.mock_run.return_value = Mock(returncode=0, stdout='box-internal\n')
 
+        self.network_manager._ensure_internal_network()
         self.network_manager._ensure_internal_network()
 
-        # Should print warning about creation failure
-        mock_print.assert_any_call("Warning: Failed to create internal network: Network creation failed")
+        self.mock_run.assert_called_once()
 
 
 class TestArgumentParsing(unittest.TestCase):
@@ -140,8 +129,7 @@ class TestArgumentParsing(unittest.TestCase):
 
     def test_no_network_flag_parsing(self):
         """Test parsing of --no-network flag"""
-        with patch('sys.argv', ['box', '-N', 'python', 'script.py']):
-            args = parse_args()
+        args = parse_args(['-N', 'python', 'script.py'])
 
         self.assertTrue(hasattr(args, 'no_network'))
         self.assertTrue(args.no_network)
@@ -149,8 +137,7 @@ class TestArgumentParsing(unittest.TestCase):
 
     def test_internal_network_flag_parsing(self):
         """Test parsing of --internal-network flag"""
-        with patch('sys.argv', ['box', '--internal-network', 'bash']):
-            args = parse_args()
+        args = parse_args(['--internal-network', 'bash'])
 
         self.assertTrue(hasattr(args, 'internal_network'))
         self.assertTrue(args.internal_network)
@@ -158,8 +145,7 @@ class TestArgumentParsing(unittest.TestCase):
 
     def test_http_proxy_flag_parsing(self):
         """Test parsing of --http-proxy flag"""
-        with patch('sys.argv', ['box', '--http-proxy', 'http://proxy:3128', 'curl', 'example.com']):
-            args = parse_args()
+        args = parse_args(['--http-proxy', 'http://proxy:3128', 'curl', 'example.com'])
 
         self.assertTrue(hasattr(args, 'http_proxy'))
         self.assertEqual(args.http_proxy, 'http://proxy:3128')
@@ -167,14 +153,12 @@ class TestArgumentParsing(unittest.TestCase):
 
     def test_mutually_exclusive_network_flags(self):
         """Test that --no-network and --internal-network are mutually exclusive"""
-        with patch('sys.argv', ['box', '-N', '--internal-network', 'bash']):
-            with self.assertRaises(SystemExit):  # argparse should exit on conflicting args
-                parse_args()
+        with self.assertRaises(SystemExit):  # argparse should exit on conflicting args
+            parse_args(['-N', '--internal-network', 'bash'])
 
     def test_combined_flags(self):
         """Test combining proxy with other options"""
-        with patch('sys.argv', ['box', '--http-proxy', 'http://proxy:3128', '-rw', '.', 'npm', 'install']):
-            args = parse_args()
+        args = parse_args(['--http-proxy', 'http://proxy:3128', '-rw', '.', 'npm', 'install'])
 
         self.assertEqual(args.http_proxy, 'http://proxy:3128')
         self.assertEqual(args.read_write, ['.'])
@@ -184,19 +168,22 @@ class TestArgumentParsing(unittest.TestCase):
 class TestNetworkIntegration(unittest.TestCase):
     """Test integration of network features with main functionality"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the runtime mocks shared by every test"""
+        cls.docker_runtime = Mock(spec=ContainerRuntime)
+        cls.docker_runtime.runtime = 'docker'
+        cls.podman_runtime = Mock(spec=ContainerRuntime)
+        cls.podman_runtime.runtime = 'podman'
+
     def test_network_args_added_to_container_command(self):
         """Test that network arguments are properly integrated into container run command"""
         # This would be tested in integration tests with actual container runtime
         # For now, we verify the NetworkManager produces the right arguments
-        runtime = Mock(spec=ContainerRuntime)
-        runtime.runtime = 'docker'
-        network_manager = NetworkManager(runtime)
+        network_manager = NetworkManager(self.docker_runtime)
 
         # Test no-network
-        args = Mock()
-        args.no_network = True
-        args.internal_network = False
-        args.http_proxy = None
+        args = Mock(no_network=True, internal_network=False, http_proxy=None)
 
         network_args, env_vars = network_manager.get_network_args(args)
         env_args = network_manager.format_env_args(env_vars)
@@ -208,22 +195,19 @@ class TestNetworkIntegration(unittest.TestCase):
 
     def test_proxy_env_vars_formatting(self):
         """Test that proxy environment variables are correctly formatted"""
-        runtime = Mock(spec=ContainerRuntime)
-        runtime.runtime = 'podman'
-        network_manager = NetworkManager(runtime)
+        network_manager = NetworkManager(self.podman_runtime)
 
-        args = Mock()
-        args.no_network = False
-        args.internal_network = False
-        args.http_proxy = 'http://corporate-proxy:8080'
+        args = Mock(no_network=False, internal_network=False, http_proxy='http://corporate-proxy:8080')
 
         network_args, env_vars = network_manager.get_network_args(args)
         env_args = network_manager.format_env_args(env_vars)
 
-        # Should have 4 environment variables (upper and lowercase variants)
-        self.assertEqual(len(env_args), 8)  # 4 vars * 2 args each (-e VAR=value)
-        self.assertIn('-e', env_args)
-        self.assertIn('HTTP_PROXY=http://corporate-proxy:8080', env_args)
+        # Should have 4 environment variables (upper and lowercase variants), each as -e VAR=value
+        self.assertEqual(env_args[::2], ['-e'] * 4)
+        self.assertEqual(set(env_args[1::2]), {
+            f'{name}=http://corporate-proxy:8080'
+            for name in ('HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy')
+        })
 
 
 if __name__ == '__main__':
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Tests for SSHFS mount management"""
+
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from box.ssh_mount import SSHFSManager, _list_dir_with_timeout
+
+
+class TestCleanupMounts(unittest.TestCase):
+    """Test unmounting every tracked SSH mount"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.ssh_mgr = SSHFSManager()
+        self.ssh_mgr.ssh_mounts = {
+            '/mnt/one': ('user@host:/one', True),
+            '/mnt/two': ('user@host:/two', True),
+            '/mnt/three': ('user@host:/three', False),
+        }
+
+    @patch('builtins.print')
+    @patch('box.ssh_mount.is_darwin', return_value=False)
+    @patch('subprocess.run')
+    def test_cleanup_unmounts_each_active_mount(self, mock_run, mock_darwin, mock_print):
+        """Test that every active mount is unmounted and tracking is cleared"""
+        mock_run.return_value = MagicMock(returncode=0)
+
+        self.ssh_mgr.cleanup_mounts()
+
+        unmounted = sorted(call[0][0][1] for call in mock_run.call_args_list)
+        self.assertEqual(unmounted, ['/mnt/one', '/mnt/two'])
+        mock_print.assert_any_call("✓ Unmounted user@host:/one")
+        mock_print.assert_any_call("✓ Unmounted user@host:/two")
+        self.assertEqual(self.ssh_mgr.ssh_mounts, {})
+
+    @patch('builtins.print')
+    @patch('box.ssh_mount.is_darwin', return_value=False)
+    @patch('subprocess.run')
+    def test_exit_handler_unmounts_without_threads(self, mock_run, mock_darwin, mock_print):
+        """Test that the atexit cleanup works when threads can no longer be started"""
+        mock_run.return_value = MagicMock(returncode=0)
+        with patch('box.ssh_mount.atexit.register') as mock_register:
+            ssh_mgr = SSHFSManager()
+        ssh_mgr.ssh_mounts = dict(self.ssh_mgr.ssh_mounts)
+        handler, = mock_register.call_args[0]
+
+        # Python 3.12+ refuses to start threads while the interpreter shuts down
+        with patch('box.ssh_mount.threading.Thread.start',
+                   side_effect=RuntimeError("can't create new thread at interpreter shutdown")):
+            handler(**mock_register.call_args[1])
+
+        unmounted = sorted(call[0][0][1] for call in mock_run.call_args_list)
+        self.assertEqual(unmounted, ['/mnt/one', '/mnt/two'])
+        self.assertEqual(ssh_mgr.ssh_mounts, {})
+
+
+class TestListDirWithTimeout(unittest.TestCase):
+    """Test verifying a mount without spawning a process"""
+
+    def test_lists_directory(self):
+        """Test that the directory entries are returned"""
+        with patch('box.ssh_mount.os.listdir', return_value=['a', 'b']):
+            self.assertEqual(_list_dir_with_timeout('/mnt/one', timeout=5), ['a', 'b'])
+
+    def test_hung_listing_times_out(self):
+        """Test that a listing that does not return in time raises TimeoutError"""
+        with patch('box.ssh_mount.os.listdir', side_effect=lambda path: time.sleep(1)):
+            with self.assertRaises(TimeoutError):
+                _list_dir_with_timeout('/mnt/one', timeout=0.05)
+
+    def test_listing_error_is_raised(self):
+        """Test that an inaccessible directory raises the underlying error"""
+        with patch('box.ssh_mount.os.listdir', side_effect=PermissionError('denied')):
+            with self.assertRaises(PermissionError):
+                _list_dir_with_timeout('/mnt/one', timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
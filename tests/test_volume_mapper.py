@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Tests for volume mount handling"""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from box.cli import VolumeMapper, ContainerRuntime
+
+
+class TestVolumeMapper(unittest.TestCase):
+    """Test local and SSH mount processing"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.runtime = Mock(spec=ContainerRuntime)
+        self.runtime.runtime = 'docker'
+        self.volume_mapper = VolumeMapper(self.runtime)
+
+    def test_local_mounts_do_not_create_sshfs_manager(self):
+        """Test that SSH support is not set up when only local paths are mounted"""
+        args = SimpleNamespace(read_only=['/data'], read_write=['/code'])
+
+        volume_args, first_mount = self.volume_mapper.get_volume_args(args)
+
+        self.assertEqual(volume_args, ['-v', '/data:/root/data:ro', '-v', '/code:/root/code:rw'])
+        self.assertEqual(first_mount, '/root/data')
+        self.assertIsNone(self.volume_mapper._sshfs_mgr)
+        self.assertFalse(self.volume_mapper.has_ssh_mounts())
+
+    def test_ssh_mount_uses_remote_basename(self):
+        """Test that an SSH mount is created on demand and mounted under the remote basename"""
+        with patch('box.ssh_mount.SSHFSManager.create_ssh_mount', return_value='/tmp/mnt') as mock_mount:
+            result = self.volume_mapper._process_mount_spec('user@host:/srv/app', read_only=True)
+
+        self.assertEqual(result, (['-v', '/tmp/mnt:/root/app:ro'], '/root/app'))
+        mock_mount.assert_called_once_with('user@host:/srv/app', True)
+        self.assertIsNotNone(self.volume_mapper._sshfs_mgr)
+
+    def test_split_ssh_spec(self):
+        """Test splitting the container destination off an SSH spec"""
+        self.assertEqual(VolumeMapper._split_ssh_spec('user@host:/srv/app'), ('user@host:/srv/app', None))
+        self.assertEqual(VolumeMapper._split_ssh_spec('user@host:/srv/app:/work'), ('user@host:/srv/app', '/work'))
+
+
+if __name__ == '__main__':
+    unittest.main()